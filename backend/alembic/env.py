@@ -1,6 +1,6 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import pool, text
 from alembic import context
 import os
 import sys
@@ -14,7 +14,8 @@ load_dotenv()
 
 # Import your models here
 from app.core.database import Base
-from app.core.config import DB_URL
+from app.core.config import DB_URL, MIGRATION_LOCK_TIMEOUT_MS
+from app.core.online_migrations import CHECKPOINT_TABLE
 import app.models  # This imports all models so Alembic can detect them
 
 # this is the Alembic Config object, which provides
@@ -38,6 +39,21 @@ target_metadata = Base.metadata
 def get_url():
     return DB_URL
 
+
+# Partitions of partitioned tables (e.g. auth_audit_events_2026_10) are created at runtime
+PARTITION_PREFIXES = tuple(
+    f"{table.name}_" for table in target_metadata.tables.values()
+    if table.dialect_options["postgresql"].get("partition_by")
+)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from tables the models do not describe on purpose."""
+    if type_ == "table" and reflected and compare_to is None:
+        return name != CHECKPOINT_TABLE and not name.startswith(PARTITION_PREFIXES)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -56,6 +72,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -78,8 +96,17 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # DDL waiting for a lock blocks every query queued behind it; give up quickly instead
+        # (app.core.online_migrations.with_lock_retry retries with backoff)
+        connection.execute(text(f"SET lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}"))
+        connection.commit()
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # Each migration commits on its own: locks are released between them, and a
+            # failure leaves the earlier migrations applied
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
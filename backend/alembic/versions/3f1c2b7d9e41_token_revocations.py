@@ -0,0 +1,40 @@
+"""token revocations
+
+Revision ID: 3f1c2b7d9e41
+Revises: a9c4c0f8cb88
+Create Date: 2026-10-19 09:12:40.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2b7d9e41'
+down_revision = 'a9c4c0f8cb88'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('token_revocations',
+    sa.Column('jti', sa.String(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_token_revocations_jti'), 'token_revocations', ['jti'], unique=False)
+    op.create_index(op.f('ix_token_revocations_user_id'), 'token_revocations', ['user_id'], unique=False)
+    op.create_index(op.f('ix_token_revocations_revoked_at'), 'token_revocations', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_token_revocations_revoked_at'), table_name='token_revocations')
+    op.drop_index(op.f('ix_token_revocations_user_id'), table_name='token_revocations')
+    op.drop_index(op.f('ix_token_revocations_jti'), table_name='token_revocations')
+    op.drop_table('token_revocations')
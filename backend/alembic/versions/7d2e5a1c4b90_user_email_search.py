@@ -0,0 +1,32 @@
+"""user email search indexes
+
+Revision ID: 7d2e5a1c4b90
+Revises: 3f1c2b7d9e41
+Create Date: 2026-10-19 14:03:27.551820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e5a1c4b90'
+down_revision = '3f1c2b7d9e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Concurrent builds keep users writable, outside the migration's transaction and lock_timeout
+    create_index_concurrently('ix_users_email_lower', 'users', [sa.text('lower(email) text_pattern_ops')])
+    create_index_concurrently(
+        'ix_users_email_trgm', 'users', [sa.text('lower(email) gin_trgm_ops')], postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_users_email_trgm', 'users')
+    drop_index_concurrently('ix_users_email_lower', 'users')
@@ -0,0 +1,26 @@
+"""purge idempotency keys hashed without a secret
+
+Revision ID: a3d7f9b1c2e5
+Revises: f2c6d8e0a9b4
+Create Date: 2026-10-19 09:12:40.318265
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d7f9b1c2e5'
+down_revision = 'f2c6d8e0a9b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fingerprints were plain SHA-256 digests of request bodies that carry passwords. Keys and
+    # fingerprints are HMACs now, so the old rows can never match again; drop them rather than
+    # keep them until they expire
+    op.execute('DELETE FROM idempotency_keys')
+
+
+def downgrade() -> None:
+    pass
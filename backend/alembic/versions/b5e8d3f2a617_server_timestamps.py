@@ -0,0 +1,62 @@
+"""server-side timestamps
+
+Revision ID: b5e8d3f2a617
+Revises: 7d2e5a1c4b90
+Create Date: 2026-10-19 16:41:05.203917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import backfill_in_batches, set_not_null, with_lock_retry
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8d3f2a617'
+down_revision = '7d2e5a1c4b90'
+branch_labels = None
+depends_on = None
+
+# Unix milliseconds in the first 48 bits of a version 7 UUID
+UUID7_CREATED_AT = "to_timestamp(('x' || substr(replace(id::text, '-', ''), 1, 12))::bit(48)::bigint / 1000.0)"
+# Python defaults were evaluated once at import, so stored timestamps are the worker start
+# time. Recover what can be recovered: v7 ids embed the creation time, revocations have
+# revoked_at, and a user was updated no earlier than their last login.
+USER_CREATED_AT = f"CASE WHEN substr(id::text, 15, 1) = '7' THEN {UUID7_CREATED_AT} ELSE COALESCE(created_at, now()) END"
+USER_UPDATED_AT = (
+    f"GREATEST(COALESCE(updated_at, {USER_CREATED_AT}), {USER_CREATED_AT}, last_connected_at)"
+)
+
+TIMESTAMP_TABLES = ('users', 'token_revocations')
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')
+
+
+def upgrade() -> None:
+    # Columns used by the User model since account activation, missing from the initial migration
+    for column, type_ in (('is_active', 'BOOLEAN'), ('activation_code', 'VARCHAR'), ('reset_password_code', 'VARCHAR')):
+        with_lock_retry(lambda: op.execute(f'ALTER TABLE users ADD COLUMN IF NOT EXISTS {column} {type_}'))
+    for table in TIMESTAMP_TABLES:
+        for column in TIMESTAMP_COLUMNS:
+            with_lock_retry(lambda: op.alter_column(table, column, server_default=sa.text('now()')))
+
+    # In short batches, skipping rows that already hold the recovered values, so a re-run is cheap
+    backfill_in_batches(
+        'users',
+        f"created_at = {USER_CREATED_AT}, updated_at = {USER_UPDATED_AT}",
+        where=f"created_at IS DISTINCT FROM {USER_CREATED_AT} OR updated_at IS DISTINCT FROM {USER_UPDATED_AT}",
+    )
+    backfill_in_batches(
+        'token_revocations',
+        'created_at = revoked_at, updated_at = revoked_at',
+        where='created_at IS DISTINCT FROM revoked_at OR updated_at IS DISTINCT FROM revoked_at',
+    )
+
+    for table in TIMESTAMP_TABLES:
+        for column in TIMESTAMP_COLUMNS:
+            set_not_null(table, column)
+
+
+def downgrade() -> None:
+    for table in TIMESTAMP_TABLES:
+        for column in TIMESTAMP_COLUMNS:
+            with_lock_retry(lambda: op.alter_column(table, column, server_default=None, nullable=True))
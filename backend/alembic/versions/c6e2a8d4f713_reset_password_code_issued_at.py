@@ -0,0 +1,34 @@
+"""reset password code issue time
+
+Revision ID: c6e2a8d4f713
+Revises: a3d7f9b1c2e5
+Create Date: 2026-10-19 10:27:05.941732
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import backfill_in_batches, with_lock_retry
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e2a8d4f713'
+down_revision = 'a3d7f9b1c2e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with_lock_retry(lambda: op.add_column(
+        'users', sa.Column('reset_password_code_issued_at', sa.DateTime(timezone=True), nullable=True)
+    ))
+    # Codes sent before this column existed were issued no later than the user's last update
+    backfill_in_batches(
+        'users',
+        'reset_password_code_issued_at = updated_at',
+        where='reset_password_code IS NOT NULL AND reset_password_code_issued_at IS NULL',
+    )
+
+
+def downgrade() -> None:
+    with_lock_retry(lambda: op.drop_column('users', 'reset_password_code_issued_at'))
@@ -0,0 +1,60 @@
+"""auth audit events
+
+Revision ID: c81f4e6a2d35
+Revises: b5e8d3f2a617
+Create Date: 2026-10-19 18:22:51.907164
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4e6a2d35'
+down_revision = 'b5e8d3f2a617'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table('auth_audit_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('client_ip', sa.String(), nullable=True),
+    sa.Column('correlation_id', sa.String(), nullable=True),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index('ix_auth_audit_events_user_id_occurred_at', 'auth_audit_events', ['user_id', 'occurred_at'], unique=False)
+    op.create_index('ix_auth_audit_events_email_occurred_at', 'auth_audit_events', ['email', 'occurred_at'], unique=False)
+
+    # One partition per month from the current one; the maintenance job keeps creating them ahead.
+    # The default partition catches anything outside, so an insert never fails for lack of one.
+    this_month = date.today().replace(day=1)
+    for offset in range(MONTHS_AHEAD + 1):
+        start, end = _add_months(this_month, offset), _add_months(this_month, offset + 1)
+        op.execute(
+            f"CREATE TABLE auth_audit_events_{start:%Y_%m} PARTITION OF auth_audit_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute('CREATE TABLE auth_audit_events_default PARTITION OF auth_audit_events DEFAULT')
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition
+    op.drop_table('auth_audit_events')
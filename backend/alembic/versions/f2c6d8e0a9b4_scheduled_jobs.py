@@ -0,0 +1,35 @@
+"""scheduled jobs
+
+Revision ID: f2c6d8e0a9b4
+Revises: e4b9a2c7f153
+Create Date: 2026-10-19 22:31:48.610274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6d8e0a9b4'
+down_revision = 'e4b9a2c7f153'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduled_jobs',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_slot', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_duration_ms', sa.Float(), nullable=True),
+    sa.Column('last_items', sa.BigInteger(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('runs', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('failures', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduled_jobs')
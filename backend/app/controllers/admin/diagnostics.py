@@ -0,0 +1,115 @@
+import asyncio
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from app.core.audit import audit_log
+from app.core.auth import get_superuser
+from app.core.database import get_db
+from app.diagnostics import endpoint_routes, loop_lag_monitor, memory_monitor, profiler
+from app.jobs import scheduler
+from app.repositories.scheduled_job import ScheduledJobRepo
+from app.schemas.controller.admin.audit_log_stats_response import AuditLogStatsResponse
+from app.schemas.controller.admin.loop_lag_response import LoopLagResponse
+from app.schemas.controller.admin.memory_diff_response import MemoryDiffResponse
+from app.schemas.controller.admin.memory_stats_response import MemoryStatsResponse
+from app.schemas.controller.admin.profile_response import ProfileResponse
+from app.schemas.controller.admin.scheduled_jobs_response import ScheduledJobsResponse
+from app.schemas.controller.admin.tracemalloc_response import TracemallocResponse
+
+# Every diagnostics endpoint reports on the worker process that serves the request
+diagnostics_router = APIRouter(dependencies=[Depends(get_superuser)])
+
+SNAPSHOT_NAME = r"^[A-Za-z0-9_.-]{1,64}$"
+
+
+@diagnostics_router.get("/loop-lag", response_model=LoopLagResponse)
+async def get_loop_lag():
+    """Event-loop lag percentiles and blocking stall count for this worker."""
+    return LoopLagResponse(pid=os.getpid(), **loop_lag_monitor.percentiles())
+
+
+@diagnostics_router.get("/audit-log", response_model=AuditLogStatsResponse)
+async def get_audit_log_stats():
+    """Audit events recorded, written, buffered and lost by this worker."""
+    return AuditLogStatsResponse(pid=os.getpid(), **audit_log.stats())
+
+
+@diagnostics_router.get("/jobs", response_model=ScheduledJobsResponse)
+def get_scheduled_jobs(db: Session = Depends(get_db)):
+    """Scheduled jobs: this worker's run counters, and the last run on any instance."""
+    history = {row.name: row for row in ScheduledJobRepo(db).list_all()}
+    jobs = []
+    for stats in scheduler.stats():
+        row = history.get(stats["name"])
+        if row is not None:
+            stats.update(
+                last_slot=row.last_slot,
+                last_finished_at=row.last_finished_at,
+                total_runs=row.runs,
+                total_failures=row.failures,
+            )
+        jobs.append(stats)
+    return ScheduledJobsResponse(pid=os.getpid(), enabled=scheduler.enabled, jobs=jobs)
+
+
+@diagnostics_router.get("/profile", response_model=ProfileResponse, responses={200: {"content": {"text/plain": {}}}})
+async def get_profile(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = Query(False, description="Also count threads waiting for work"),
+    format: str = Query("json", pattern="^(json|collapsed)$", description="collapsed: plain-text stacks for flamegraph.pl"),
+):
+    """Sample every thread of this worker for `seconds` and report where the time goes, by route."""
+    result = await asyncio.to_thread(
+        profiler.profile,
+        seconds,
+        interval_ms / 1000,
+        endpoints=endpoint_routes(request.app.routes),
+        include_idle=include_idle,
+    )
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return ProfileResponse(pid=os.getpid(), **result)
+
+
+@diagnostics_router.get("/memory", response_model=MemoryStatsResponse)
+def get_memory_stats():
+    """RSS history, garbage collector, live database sessions and tracemalloc state of this worker."""
+    return MemoryStatsResponse(pid=os.getpid(), **memory_monitor.stats())
+
+
+@diagnostics_router.post("/memory/tracemalloc/start", response_model=TracemallocResponse)
+def start_tracemalloc(frames: int = Query(1, ge=1, le=25, description="Stack frames recorded per allocation")):
+    """Start tracing allocations in this worker. Slows it down until stopped."""
+    memory_monitor.start_tracing(frames)
+    return TracemallocResponse(pid=os.getpid(), **memory_monitor.tracemalloc_status())
+
+
+@diagnostics_router.post("/memory/tracemalloc/stop", response_model=TracemallocResponse)
+def stop_tracemalloc():
+    """Stop tracing allocations in this worker and drop its snapshots."""
+    memory_monitor.stop_tracing()
+    return TracemallocResponse(pid=os.getpid(), **memory_monitor.tracemalloc_status())
+
+
+@diagnostics_router.post("/memory/snapshots/{name}", response_model=TracemallocResponse)
+def take_memory_snapshot(name: str = Path(..., pattern=SNAPSHOT_NAME)):
+    """Take a named tracemalloc snapshot in this worker."""
+    memory_monitor.take_snapshot(name)
+    return TracemallocResponse(pid=os.getpid(), **memory_monitor.tracemalloc_status())
+
+
+@diagnostics_router.get("/memory/snapshots/{base}/diff", response_model=MemoryDiffResponse)
+def diff_memory_snapshots(
+    base: str = Path(..., pattern=SNAPSHOT_NAME),
+    target: Optional[str] = Query(None, pattern=SNAPSHOT_NAME, description="Snapshot to compare; a new one by default"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=200),
+):
+    """Top allocation growth between two snapshots of this worker."""
+    return MemoryDiffResponse(pid=os.getpid(), **memory_monitor.diff(base, target, group_by, limit))
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_superuser
+from app.core.database import get_read_db
+from app.schemas.controller.admin.user_search_response import UserSearchResponse
+from app.services.user.user import UserService
+
+users_router = APIRouter(dependencies=[Depends(get_superuser)])
+user_service = UserService()
+
+
+@users_router.get("/search", response_model=UserSearchResponse)
+def search_users(
+    q: str = Query(..., min_length=1, max_length=254, description="Part of the email address, case-insensitive"),
+    prefix: bool = Query(False, description="Only match emails starting with q"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_read_db)
+):
+    """Search users by email, for support staff."""
+    return user_service.search_users(db, q, prefix, limit, cursor)
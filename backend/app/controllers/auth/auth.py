@@ -6,8 +6,19 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core.auth import Auth
+from app.core.conditional import ConditionalRequest, etag_for
+from app.core.config import (
+    RATE_LIMIT_FORGOT_PASSWORD_PER_ACCOUNT,
+    RATE_LIMIT_FORGOT_PASSWORD_PER_IP,
+    RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    RATE_LIMIT_LOGIN_PER_IP,
+    RATE_LIMIT_REGISTER_PER_IP,
+    RATE_LIMIT_RESET_PASSWORD_PER_IP,
+)
 from app.core.database import get_db
+from app.core.rate_limit import RateLimit, body_field, client_ip
 from app.exceptions import AuthError
+from app.repositories.user_loader import UserLoader, get_read_user_loader, get_user_loader
 from app.schemas.core.jwt_payload import JWTPayload
 from app.schemas.controller.login.login_response import LoginResponse
 from app.schemas.controller.login.refresh_response import RefreshResponse
@@ -21,6 +32,7 @@ from app.schemas.controller.login.reset_password_response import ResetPasswordRe
 from app.schemas.controller.login.password_update_request import PasswordUpdateRequest
 from app.schemas.controller.login.password_update_response import PasswordUpdateResponse
 from app.schemas.controller.login.me_response import MeResponse
+from app.schemas.controller.login.logout_response import LogoutResponse
 from app.schemas.model.user.user_create import UserCreate
 from app.services.auth.auth import AuthService
 
@@ -29,8 +41,20 @@ logger = logging.getLogger(__name__)
 auth_router = APIRouter()
 auth_service = AuthService()
 
+# Rate limits are enforced as dependencies, before any hashing or email work
+login_rate_limit = RateLimit("login", [
+    (client_ip, RATE_LIMIT_LOGIN_PER_IP),
+    (body_field("username"), RATE_LIMIT_LOGIN_PER_ACCOUNT),
+])
+register_rate_limit = RateLimit("register", [(client_ip, RATE_LIMIT_REGISTER_PER_IP)])
+forgot_password_rate_limit = RateLimit("forgot-password", [
+    (client_ip, RATE_LIMIT_FORGOT_PASSWORD_PER_IP),
+    (body_field("email"), RATE_LIMIT_FORGOT_PASSWORD_PER_ACCOUNT),
+])
+reset_password_rate_limit = RateLimit("reset-password", [(client_ip, RATE_LIMIT_RESET_PASSWORD_PER_IP)])
 
-@auth_router.post("/register", response_model=RegisterResponse)
+
+@auth_router.post("/register", response_model=RegisterResponse, dependencies=[Depends(register_rate_limit)])
 async def register(
     user_data: UserCreate,
     db: Session = Depends(get_db)
@@ -49,27 +73,29 @@ async def register(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@auth_router.post("/login", response_model=LoginResponse)
+@auth_router.post("/login", response_model=LoginResponse, dependencies=[Depends(login_rate_limit)])
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    user_loader: UserLoader = Depends(get_user_loader)
 ):
     """Login user and return access and refresh tokens."""
     user = auth_service.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise AuthError("Incorrect email or password")
-    response = auth_service.create_tokens(db, user.id)
+    user_loader.prime(user)
+    response = await auth_service.create_tokens(user_loader, user.id)
     return response
 
 
 @auth_router.post("/refresh", response_model=RefreshResponse)
 async def refresh_access_token(
     user_data: JWTPayload = Depends(auth_service.auth.get_user_from_refresh_token),
-    db: Session = Depends(get_db)
+    user_loader: UserLoader = Depends(get_read_user_loader)
 ):
     """Get a new access token using a refresh token."""
     try:
-        return auth_service.refresh_access_token(db, user_data.sub)
+        return await auth_service.refresh_access_token(user_loader, user_data.sub)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -84,10 +110,12 @@ async def refresh_access_token(
 @auth_router.get("/me", response_model=MeResponse)
 async def get_current_user_info(
     current_user: JWTPayload = Depends(auth_service.auth.get_current_user),
-    db: Session = Depends(get_db)
+    user_loader: UserLoader = Depends(get_read_user_loader),
+    conditional: ConditionalRequest = Depends()
 ):
-    """Get current user information."""
-    user = auth_service.get_user_by_id(db, UUID(current_user.sub))
+    """Get current user information; answers 304 when If-None-Match holds the current ETag."""
+    user = await auth_service.get_user_snapshot(user_loader, UUID(current_user.sub))
+    conditional.check(etag_for(user.id, user.updated_at.isoformat()))
     return MeResponse(
         id=user.id,
         email=user.email,
@@ -117,7 +145,7 @@ async def activate_user(
         )
 
 
-@auth_router.post("/forgot-password", response_model=ForgotPasswordResponse)
+@auth_router.post("/forgot-password", response_model=ForgotPasswordResponse, dependencies=[Depends(forgot_password_rate_limit)])
 async def forgot_password(
     request: ForgotPasswordRequest,
     db: Session = Depends(get_db)
@@ -127,7 +155,7 @@ async def forgot_password(
     return ForgotPasswordResponse(message="If the email exists, a password reset link has been sent")
 
 
-@auth_router.post("/reset-password", response_model=ResetPasswordResponse)
+@auth_router.post("/reset-password", response_model=ResetPasswordResponse, dependencies=[Depends(reset_password_rate_limit)])
 async def reset_password(
     request: ResetPasswordRequest,
     db: Session = Depends(get_db)
@@ -160,3 +188,22 @@ async def change_password(
     )
     return PasswordUpdateResponse(message="Password updated successfully", success=True)
 
+
+@auth_router.post("/logout", response_model=LogoutResponse)
+async def logout(
+    user_data: JWTPayload = Depends(auth_service.auth.get_user_from_refresh_token),
+    db: Session = Depends(get_db)
+):
+    """Revoke the refresh token used to call this endpoint."""
+    auth_service.logout(db, user_data)
+    return LogoutResponse(message="Logged out successfully", success=True)
+
+
+@auth_router.post("/logout-all", response_model=LogoutResponse)
+async def logout_all(
+    current_user: JWTPayload = Depends(auth_service.auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke every session of the current user."""
+    auth_service.logout_all(db, UUID(current_user.sub))
+    return LogoutResponse(message="Logged out of all sessions", success=True)
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import AUDIT_BATCH_SIZE, AUDIT_BUFFER_SIZE, AUDIT_FLUSH_INTERVAL_MS, AUDIT_LOG_ENABLED
+from app.core.context import get_client_ip, get_correlation_id
+from app.core.database import SessionLocal
+from app.core.uuid7 import uuid7
+from app.repositories.auth_audit_event import AuthAuditEventRepo
+
+logger = logging.getLogger(__name__)
+
+# Event types
+LOGIN = "login"
+TOKEN_REFRESH = "token_refresh"
+ACCOUNT_ACTIVATION = "account_activation"
+PASSWORD_CHANGE = "password_change"
+PASSWORD_RESET = "password_reset"
+LOGOUT = "logout"
+LOGOUT_ALL = "logout_all"
+
+
+class AuditLog:
+    """
+    Per-worker buffered writer for the auth_audit_events table.
+
+    `record` never touches the database: it appends to a bounded in-memory
+    buffer and returns. A background task writes the buffer in batches of up
+    to `batch_size` rows, one COPY per batch, every `flush_interval` or as soon
+    as a batch is full. When the database falls behind, the buffer absorbs the
+    backlog up to `max_buffer` events; beyond that new events are dropped
+    rather than slowing down logins, and every loss is counted in `stats()`.
+    A batch that fails to write goes back to the buffer for a retry if there
+    is room. The buffer is flushed when the worker shuts down.
+    """
+
+    def __init__(
+        self,
+        max_buffer: int = 10_000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        session_factory: sessionmaker = SessionLocal,
+        enabled: bool = True,
+    ):
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self.enabled = enabled
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0  # buffer full
+        self.failed = 0  # lost after a failed write
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+        self._buffer: deque[tuple] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        event_type: str,
+        success: bool = True,
+        user_id: Optional[UUID] = None,
+        email: Optional[str] = None,
+        **details,
+    ) -> bool:
+        """Queue an event; returns False if it was dropped. Safe to call from any thread."""
+        if not self.enabled:
+            return False
+        row = (
+            uuid7(), datetime.now(timezone.utc), event_type, success, user_id, email,
+            get_client_ip(), get_correlation_id(), details or None,
+        )
+        with self._lock:
+            self.recorded += 1
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return False
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake_writer()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "recorded": self.recorded,
+            "written": self.written,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+
+    def flush(self) -> int:
+        """Write one batch from the buffer. Blocking; run it off the event loop."""
+        with self._lock:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            AuthAuditEventRepo(db).write_events(batch)
+        except Exception:
+            db.rollback()
+            self._requeue(batch)
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self.written += len(batch)
+            self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return len(batch)
+
+    def _requeue(self, batch: list[tuple]) -> None:
+        with self._lock:
+            room = max(self.max_buffer - len(self._buffer), 0)
+            # Keep the oldest events, ahead of anything recorded since
+            self._buffer.extendleft(reversed(batch[:room]))
+            self.failed += len(batch) - min(room, len(batch))
+
+    def _wake_writer(self) -> None:
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            if threading.get_ident() == self._loop_thread:
+                self._wake.set()
+            else:
+                self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            # Loop already closed during shutdown; the final flush picks the events up
+            pass
+
+    def start(self) -> None:
+        if self._task is not None or not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush what is left in the buffer."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while self._buffer:
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                with self._lock:
+                    lost = len(self._buffer)
+                    self.failed += lost
+                    self._buffer.clear()
+                logger.error(f"Failed to flush audit events on shutdown, {lost} lost: {e}")
+
+    async def _run(self) -> None:
+        backoff = self.flush_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                # Drain full batches back to back; a partial batch waits for the next tick
+                while await asyncio.to_thread(self.flush) == self.batch_size:
+                    pass
+                backoff = self.flush_interval
+            except Exception as e:
+                logger.error(f"Failed to write audit events ({len(self._buffer)} buffered): {e}")
+                backoff = min(backoff * 2, 30.0)
+                await asyncio.sleep(backoff)
+
+
+audit_log = AuditLog(
+    max_buffer=AUDIT_BUFFER_SIZE,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL_MS / 1000,
+    enabled=AUDIT_LOG_ENABLED,
+)
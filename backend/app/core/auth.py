@@ -1,19 +1,27 @@
 # Standard library imports
 import os
-from typing import Literal
+import time
+import uuid
+from typing import Literal, Optional, Sequence
 from uuid import UUID
 from datetime import datetime, timezone, timedelta
 
 # Third-party imports
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from jose import JWTError
 from jose.exceptions import ExpiredSignatureError
-from passlib.context import CryptContext
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.exceptions.auth import AuthError
+from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, JWT_ACTIVE_KID, JWT_KEYS_DIR, REFRESH_TOKEN_EXPIRE_DAYS
+from app.core.database import get_db
+from app.core.jwt_keys import build_keyrings
+from app.core.password_hashing import build_password_context
+from app.core.permissions import SCOPE_ADMIN, roles_for_user, scopes_for_roles
+from app.core.revocation import revocation_cache
+from app.exceptions.auth import AuthError, ForbiddenError
+from app.repositories.user import UserRepo
 from app.schemas.core.jwt_payload import JWTPayload
 
 # Create OAuth2 scheme instances
@@ -22,122 +30,138 @@ oauth2_refresh_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/refresh", scheme
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
+
+# Keys are parsed once here instead of on every encode/decode call
+ACCESS_KEYRING, REFRESH_KEYRING = build_keyrings(
+    ALGORITHM, SECRET_KEY, REFRESH_SECRET_KEY, JWT_KEYS_DIR, JWT_ACTIVE_KID
+)
 
 class Auth:
     def __init__(self):
-        # Use explicit bcrypt configuration to avoid initialization issues
-        self.pwd_context = CryptContext(
-            schemes=["bcrypt"], 
-            deprecated="auto",
-            bcrypt__default_rounds=12,
-            bcrypt__min_rounds=10,
-            bcrypt__max_rounds=15
-        )
-        self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-        self.REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+        # Work factor calibrated once per process to the configured target hash time
+        self.pwd_context = build_password_context()
+        self.ACCESS_TOKEN_EXPIRE_MINUTES = ACCESS_TOKEN_EXPIRE_MINUTES
+        self.REFRESH_TOKEN_EXPIRE_DAYS = REFRESH_TOKEN_EXPIRE_DAYS
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return self.pwd_context.verify(plain_password, hashed_password)
 
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Verify a password and return a replacement hash if the stored one is below the current policy."""
+        return self.pwd_context.verify_and_update(plain_password, hashed_password)
+
     def get_password_hash(self, password: str) -> str:
         return self.pwd_context.hash(password)
 
     def create_refresh_token(self, user_id: UUID) -> str:
         """Create both access and refresh tokens for the user."""
         # Create access token
-        refresh_expire = datetime.now(timezone.utc) + timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
+        now = datetime.now(timezone.utc)
+        refresh_expire = now + timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
         refresh_token = JWTPayload(
             sub=str(user_id),  # Convert UUID to string for JWT
             exp=int(refresh_expire.timestamp()),
-            type="refresh"
+            type="refresh",
+            iat=int(now.timestamp()),
+            jti=uuid.uuid4().hex
         )
-        return jwt.encode(refresh_token.model_dump(), REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+        return REFRESH_KEYRING.sign(refresh_token.model_dump())
 
-    def create_access_token(self, user_id: UUID) -> str:
-        access_expire = datetime.now(timezone.utc) + timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
+    def create_access_token(self, user_id: UUID, roles: Sequence[str] = ()) -> str:
+        """Create an access token carrying the user's roles and the scopes they grant as signed claims."""
+        now = datetime.now(timezone.utc)
+        access_expire = now + timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = JWTPayload(
             sub=str(user_id),  # Convert UUID to string for JWT
             exp=int(access_expire.timestamp()),
-            type="access"
+            type="access",
+            iat=int(now.timestamp()),
+            jti=uuid.uuid4().hex,
+            roles=list(roles),
+            scopes=scopes_for_roles(roles)
         )
-        return jwt.encode(access_token.model_dump(), SECRET_KEY, algorithm=ALGORITHM)
+        return ACCESS_KEYRING.sign(access_token.model_dump())
 
     @staticmethod
     async def get_current_user(token: str = Depends(oauth2_scheme)) -> JWTPayload:
         """Get the current user data from the JWT token without database query."""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = ACCESS_KEYRING.verify(token)
             if payload.get("type") != "access":
-                raise AuthenticationError("Invalid token type")
-            return JWTPayload(**payload)
+                raise AuthError("Invalid token type")
+            jwt_payload = JWTPayload(**payload)
         except ExpiredSignatureError:
-            raise AuthenticationError("Token expired")
+            raise AuthError("Token expired")
         except JWTError:
-            raise AuthenticationError("Could not validate credentials")
+            raise AuthError("Could not validate credentials")
+        # In-memory check, no database round trip
+        if revocation_cache.is_revoked(jwt_payload):
+            raise AuthError("Token has been revoked")
+        return jwt_payload
 
     @staticmethod
     async def get_user_from_refresh_token(token: str = Depends(oauth2_refresh_scheme)) -> JWTPayload:
         """Get user data from refresh token without database query."""
         try:
-            payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+            payload = REFRESH_KEYRING.verify(token)
             if payload.get("type") != "refresh":
                 print("Invalid token type detected")
-                raise AuthenticationError("Invalid refresh token type")
+                raise AuthError("Invalid refresh token type")
                 
             jwt_payload = JWTPayload(**payload)
-            return jwt_payload
             
         except ExpiredSignatureError as e:
             print(f"Token expired: {str(e)}")
-            raise AuthenticationError("Refresh token expired")
+            raise AuthError("Refresh token expired")
         except JWTError as e:
             print(f"JWT Error: {str(e)}")
-            raise AuthenticationError("Could not validate refresh token")
+            raise AuthError("Could not validate refresh token")
         except Exception as e:
             print(f"Unexpected error: {str(e)}")
-            raise AuthenticationError("Authentication failed")
+            raise AuthError("Authentication failed")
 
-    @staticmethod
-    async def get_superuser(
-        token: str = Depends(oauth2_scheme)
+        if revocation_cache.is_revoked(jwt_payload):
+            raise AuthError("Refresh token has been revoked")
+        return jwt_payload
+
+
+def _authorize(payload: JWTPayload, required: frozenset[str]) -> None:
+    if not required.issubset(payload.scopes):
+        raise ForbiddenError("Not authorized. Missing required permission.")
+
+
+def require_scopes(*scopes: str, max_age: Optional[int] = None):
+    """
+    Build a dependency that authorizes the request from the access token's scope claims.
+
+    The required scopes are fixed when the dependency is built, and the common
+    path needs no database access. With `max_age` (seconds), tokens issued
+    longer ago than that have their roles re-read from the database, bounding
+    how long a revoked role stays usable.
+    """
+    required = frozenset(scopes)
+
+    if max_age is None:
+        async def check_scopes(current_user: JWTPayload = Depends(Auth.get_current_user)) -> JWTPayload:
+            _authorize(current_user, required)
+            return current_user
+        return check_scopes
+
+    def check_scopes_with_recheck(
+        current_user: JWTPayload = Depends(Auth.get_current_user),
+        db: Session = Depends(get_db)
     ) -> JWTPayload:
-        """Verify that the current user is a superuser.
-        Note: This requires database access, so it should be used with db: Session = Depends(get_db) in the endpoint.
-        """
-        # Import here to avoid circular dependency
-        from app.core.database import get_db
-        from app.repositories.user.user_repository import UserRepository
-        
-        # First, validate the token and get JWT payload
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            if payload.get("type") != "access":
-                raise AuthenticationError("Invalid token type")
-            jwt_payload = JWTPayload(**payload)
-        except ExpiredSignatureError:
-            raise AuthenticationError("Token expired")
-        except JWTError:
-            raise AuthenticationError("Could not validate credentials")
-        
-        # Get database session and check superuser status
-        db = next(get_db())
-        try:
-            user_repo = UserRepository()
-            user = user_repo.get_by_id(db, UUID(jwt_payload.sub))
-            
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            if not user.is_superuser:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not authorized. Superuser access required."
-                )
-            
-            return jwt_payload
-        finally:
-            db.close()
+        if current_user.iat is None or time.time() - current_user.iat > max_age:
+            user = UserRepo(db).get(id=UUID(current_user.sub))
+            if not user or not user.is_active:
+                raise AuthError("User no longer exists or is inactive")
+            roles = roles_for_user(user)
+            current_user = current_user.model_copy(update={"roles": roles, "scopes": scopes_for_roles(roles)})
+        _authorize(current_user, required)
+        return current_user
+    return check_scopes_with_recheck
+
+
+# Superuser-only routes authorize from the signed claims, without a user lookup
+get_superuser = require_scopes(SCOPE_ADMIN)
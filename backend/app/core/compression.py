@@ -0,0 +1,119 @@
+"""
+Content codings for HTTP responses: gzip always, brotli and zstd through
+the `brotli` / `zstandard` packages (pinned in requirements.txt; without
+them, only gzip is offered).
+
+Encoders work incrementally, so a response can be compressed chunk by chunk
+as it is streamed; `compress` does a whole body in one call (for bodies
+known up front and for precompressing static files).
+"""
+import zlib
+from typing import Callable, Optional, Protocol, Sequence
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Feed `data`; returns whatever compressed output is ready (possibly nothing)."""
+
+    def flush(self) -> bytes:
+        """Emit everything fed so far as a decodable block, without ending the stream."""
+
+    def finish(self) -> bytes:
+        """End the stream and return the remaining output."""
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encoders() -> dict[str, Callable[[int], Encoder]]:
+    """Encoder factories (taking a level) by content-coding name, for the installed libraries."""
+    encoders: dict[str, Callable[[int], Encoder]] = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    encoder = available_encoders()[encoding](level)
+    return encoder.compress(data) + encoder.finish()
+
+
+def negotiate(accept_encoding: Optional[str], supported: Sequence[str]) -> Optional[str]:
+    """
+    Pick the content coding for a request's Accept-Encoding, or None for identity.
+
+    The client's q-values decide first; ties go to the order of `supported`
+    (the server's preference).
+    """
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(supported)
+    ]
+    quality, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if quality > 0 else None
@@ -0,0 +1,58 @@
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.config import API_VERSION
+from app.exceptions.conditional import NotModified
+
+
+def etag_for(*parts) -> str:
+    """
+    Weak ETag for a resource version, e.g. etag_for(user.id, user.updated_at).
+
+    The API version is part of the hash, so a deploy that changes a response
+    schema invalidates what clients have cached.
+    """
+    digest = hashlib.sha256(":".join(map(str, (API_VERSION, *parts))).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+
+class ConditionalRequest:
+    """
+    FastAPI dependency for conditional GETs (If-None-Match / 304).
+
+    Call `check` with the resource's ETag as soon as its version is known and
+    before building the response: it sets the ETag header, and raises
+    NotModified when the client already holds that version, so the response
+    model is never built or serialized.
+
+    Usage:
+
+        @router.get("/things/{thing_id}", response_model=ThingResponse)
+        async def get_thing(thing_id: UUID, conditional: ConditionalRequest = Depends()):
+            thing = ...
+            conditional.check(etag_for(thing.id, thing.updated_at))
+            return ThingResponse(...)
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.if_none_match = request.headers.get("If-None-Match")
+        self.response = response
+
+    def matches(self, etag: str) -> bool:
+        """Weak comparison against If-None-Match, as RFC 9110 prescribes for GET."""
+        if self.if_none_match is None:
+            return False
+        if self.if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(candidate) for candidate in self.if_none_match.split(",")}
+
+    def check(self, etag: str, cache_control: str = "private, no-cache") -> None:
+        if self.matches(etag):
+            raise NotModified(etag, cache_control)
+        self.response.headers["ETag"] = etag
+        self.response.headers["Cache-Control"] = cache_control
@@ -1,9 +1,15 @@
 from contextvars import ContextVar
-from typing import Optional
+from typing import Any, Optional
 
 # Context variable for request correlation ID
 correlation_id_ctx: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
 
+# Context variable for the client address of the request
+client_ip_ctx: ContextVar[Optional[str]] = ContextVar("client_ip", default=None)
+
+# Context variable for the ASGI scope of the request; routing adds the matched route to it later
+request_scope_ctx: ContextVar[Optional[dict[str, Any]]] = ContextVar("request_scope", default=None)
+
 
 def get_correlation_id() -> Optional[str]:
     """Get the current correlation ID from context"""
@@ -12,4 +18,32 @@ def get_correlation_id() -> Optional[str]:
 
 def set_correlation_id(correlation_id: str) -> None:
     """Set the correlation ID in context"""
-    correlation_id_ctx.set(correlation_id)
\ No newline at end of file
+    correlation_id_ctx.set(correlation_id)
+
+
+def get_client_ip() -> Optional[str]:
+    """Get the current client address from context"""
+    return client_ip_ctx.get()
+
+
+def set_client_ip(client_ip: Optional[str]) -> None:
+    """Set the client address in context"""
+    client_ip_ctx.set(client_ip)
+
+
+def set_request_scope(scope: dict[str, Any]) -> None:
+    """Set the ASGI scope of the current request in context"""
+    request_scope_ctx.set(scope)
+
+
+def route_of(scope: Optional[dict[str, Any]]) -> Optional[str]:
+    """Method and route template ("GET /api/v1/users/{user_id}") of a request scope, or its raw path before routing"""
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}".strip()
+
+
+def get_route() -> Optional[str]:
+    """Get the route of the current request from context"""
+    return route_of(request_scope_ctx.get())
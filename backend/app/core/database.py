@@ -1,16 +1,155 @@
-from sqlalchemy import create_engine
+"""
+Database engines and sessions.
+
+Writes, and reads that must see them, go to the primary (DB_URL). When
+DB_REPLICA_URLS is set, sessions from `get_read_db` send their SELECTs to a
+replica chosen round-robin; a replica that fails to connect is ejected for
+DB_REPLICA_EJECT_SECONDS and the primary serves reads if none is left.
+
+Once anything in a request writes, every session of that request reads from
+the primary, so a request always sees its own writes. Locally, point DB_URL
+and DB_REPLICA_URLS at two Postgres containers (or two databases of one
+server) to try it.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.core.config import DB_URL
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import DB_PREPARE_THRESHOLD, DB_REPLICA_EJECT_SECONDS, DB_REPLICA_URLS, DB_URL
+
+logger = logging.getLogger(__name__)
+
+
+def _connect_args(url: str) -> dict:
+    """Driver options; psycopg 3 can prepare hot statements server-side, psycopg2 cannot."""
+    if make_url(url).get_driver_name() != "psycopg":
+        return {}
+    threshold = DB_PREPARE_THRESHOLD.lower()
+    return {"prepare_threshold": None if threshold in ("", "off", "none") else int(threshold)}
+
+
+class ReplicaPool:
+    """Round-robin over replica engines, skipping the ones ejected after a connection failure."""
+
+    def __init__(self, engines: list[Engine], eject_seconds: float = 30.0):
+        self.engines = engines
+        self.eject_seconds = eject_seconds
+        self._ejected_until: dict[Engine, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def choose(self) -> Optional[Engine]:
+        """The next healthy replica, or None when there is none."""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                replica = self.engines[next(self._counter) % len(self.engines)]
+                if self._ejected_until.get(replica, 0.0) > time.monotonic():
+                    continue
+            try:
+                # Usually a pooled connection and no network round trip; a replica that
+                # cannot be reached fails here, is ejected by _on_error and the next one is tried
+                replica.connect().close()
+            except DBAPIError:
+                continue
+            return replica
+        return None
+
+    def eject(self, replica: Engine) -> None:
+        with self._lock:
+            self._ejected_until[replica] = time.monotonic() + self.eject_seconds
+        logger.warning(f"Read replica {replica.url.render_as_string()} ejected for {self.eject_seconds:.0f}s")
+
+    def _on_error(self, context) -> None:
+        # No connection yet means connecting failed; is_disconnect covers connections lost mid-use
+        if context.connection is None or context.is_disconnect:
+            self.eject(context.engine)
+
+
+class RoutingState:
+    """Shared by all sessions of one request; set once any of them writes."""
+
+    def __init__(self):
+        self.wrote = False
+
+
+class RoutingSession(Session):
+    """
+    Session that can read from a replica.
 
-engine = create_engine(DB_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    With `use_replica`, SELECTs go to one replica for the session's lifetime
+    until the request writes; flushes and DML always go to the primary and
+    pin the request to it.
+    """
+
+    def __init__(self, *args, use_replica: bool = False, routing_state: Optional[RoutingState] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_replica = use_replica
+        self.routing_state = routing_state if routing_state is not None else RoutingState()
+        self._replica: Optional[Engine] = None
+
+    @property
+    def reads_from_replica(self) -> bool:
+        return self.use_replica and not self.routing_state.wrote and bool(replica_pool.engines)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and clause.is_dml):
+            self.routing_state.wrote = True
+        elif self.reads_from_replica and clause is not None and clause.is_select:
+            if self._replica is None:
+                self._replica = replica_pool.choose()
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+engine = create_engine(DB_URL, connect_args=_connect_args(DB_URL))
+replica_pool = ReplicaPool(
+    [create_engine(url, connect_args=_connect_args(url)) for url in DB_REPLICA_URLS],
+    eject_seconds=DB_REPLICA_EJECT_SECONDS,
+)
+# Objects keep their loaded state after commit: writes return what they changed (RETURNING),
+# so expiring everything would only cost a SELECT on the next attribute access
+_session_options = {"class_": RoutingSession, "autocommit": False, "autoflush": False, "expire_on_commit": False}
+SessionLocal = sessionmaker(bind=engine, **_session_options)
+ReadSessionLocal = sessionmaker(bind=engine, use_replica=True, **_session_options)
 
 Base = declarative_base()
 
-def get_db():
+
+def dispose_engines(close: bool = True) -> None:
+    """Drop pooled connections of the primary and every replica (e.g. after fork)."""
+    engine.dispose(close=close)
+    for replica in replica_pool.engines:
+        replica.dispose(close=close)
+
+
+def get_routing_state() -> RoutingState:
+    """Dependency cached per request, so every session of the request shares it."""
+    return RoutingState()
+
+
+def get_db(routing_state: RoutingState = Depends(get_routing_state)):
     """Dependency to get database session"""
-    db = SessionLocal()
+    db = SessionLocal(routing_state=routing_state)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(routing_state: RoutingState = Depends(get_routing_state)):
+    """Dependency to get a database session for read-only endpoints; reads may go to a replica."""
+    db = ReadSessionLocal(routing_state=routing_state)
     try:
         yield db
     finally:
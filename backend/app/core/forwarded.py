@@ -0,0 +1,25 @@
+from typing import Optional
+
+from starlette.requests import HTTPConnection
+
+from app.core.config import TRUSTED_PROXY_HOPS
+
+
+def client_ip_of(connection: HTTPConnection, trusted_hops: int = TRUSTED_PROXY_HOPS) -> Optional[str]:
+    """
+    Client address of a request, as seen by the first trusted proxy.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, and the client can send the header pre-filled with
+    anything. Only the last `trusted_hops` entries were written by our own
+    proxies, so the client is the entry `trusted_hops` from the right. With
+    fewer entries than that, the left-most one was still added by a trusted
+    proxy. Without the header, or with `trusted_hops` 0, it is the peer
+    address of the connection.
+    """
+    forwarded_for = connection.headers.get("X-Forwarded-For")
+    if forwarded_for and trusted_hops > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(trusted_hops, len(hops))]
+    return connection.client.host if connection.client else None
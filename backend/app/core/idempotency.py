@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import SessionLocal
+from app.repositories.idempotency_key import IdempotencyKeyRepo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A response exactly as it was sent: status, raw header pairs and body bytes."""
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    """What a store holds for a key; `response` is None while the first request is still executing."""
+    fingerprint: str
+    response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore(ABC):
+    """Storage for idempotency keys, their reservations and the responses to replay."""
+
+    @abstractmethod
+    async def claim(self, key: str, fingerprint: str, lock_seconds: float) -> Optional[IdempotencyRecord]:
+        """
+        Atomically reserve `key` for a new execution.
+
+        Returns None when the caller now holds the reservation (for at most
+        `lock_seconds`), otherwise the record currently held under the key.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """Return the live record for `key`, or None if there is none."""
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        """Store the response of the reserved execution, to be replayed for `ttl` seconds."""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop the reservation without storing a response, so the next attempt executes again."""
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        """Wait up to `timeout` seconds for the execution holding `key` to finish; returns the latest record."""
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            record = await self.get(key)
+            remaining = deadline - time.monotonic()
+            if record is None or record.response is not None or remaining <= 0:
+                return record
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+
+class InMemoryStore(IdempotencyStore):
+    """
+    Keys kept in process memory.
+
+    Duplicates that reach the same worker are deduplicated and wake up the
+    moment the original finishes, with no infrastructure. Every worker keeps
+    its own keys though, so a retry routed to another worker or instance
+    executes again; use PostgresStore when running more than one worker.
+    """
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        # key -> (record, expiry timestamp)
+        self._records: dict[str, tuple[IdempotencyRecord, float]] = {}
+        self._finished: dict[str, asyncio.Event] = {}
+
+    async def claim(self, key: str, fingerprint: str, lock_seconds: float) -> Optional[IdempotencyRecord]:
+        now = time.monotonic()
+        record = await self.get(key)
+        if record is not None:
+            return record
+        if key not in self._records and len(self._records) >= self.max_keys:
+            self._evict(now)
+        # Wake anyone still waiting on an expired reservation of this key
+        self._notify(key)
+        self._records[key] = (IdempotencyRecord(fingerprint), now + lock_seconds)
+        self._finished[key] = asyncio.Event()
+        return None
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        record, expires_at = self._records.get(key, (None, 0.0))
+        return record if expires_at > time.monotonic() else None
+
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        record, _ = self._records[key]
+        self._records[key] = (IdempotencyRecord(record.fingerprint, response), time.monotonic() + ttl)
+        self._notify(key)
+
+    async def release(self, key: str) -> None:
+        record, _ = self._records.get(key, (None, 0.0))
+        if record is not None and record.response is None:
+            del self._records[key]
+        self._notify(key)
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        finished = self._finished.get(key)
+        if finished is not None:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(key)
+
+    def _notify(self, key: str) -> None:
+        finished = self._finished.pop(key, None)
+        if finished is not None:
+            finished.set()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired keys, or the half closest to expiry."""
+        stale = [key for key, (_, expires_at) in self._records.items() if expires_at <= now]
+        if not stale:
+            by_expiry = sorted(self._records.items(), key=lambda item: item[1][1])
+            stale = [key for key, _ in by_expiry[: len(by_expiry) // 2]]
+        for key in stale:
+            del self._records[key]
+            self._notify(key)
+
+
+class PostgresStore(IdempotencyStore):
+    """
+    Keys in the idempotency_keys table, shared by every worker and instance.
+
+    A reservation is a single INSERT ... ON CONFLICT, so exactly one of several
+    concurrent duplicates wins wherever they land; the others poll until the
+    response is stored. A reservation left by a crashed worker expires after
+    its lease and the key can be claimed again.
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+
+    async def claim(self, key: str, fingerprint: str, lock_seconds: float) -> Optional[IdempotencyRecord]:
+        return await asyncio.to_thread(self._run, lambda repo: self._record(repo.claim(key, fingerprint, lock_seconds)))
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        return await asyncio.to_thread(self._run, lambda repo: self._record(repo.get(key)))
+
+    async def complete(self, key: str, response: StoredResponse, ttl: float) -> None:
+        headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers]
+        await asyncio.to_thread(
+            self._run, lambda repo: repo.complete(key, response.status_code, headers, response.body, ttl)
+        )
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._run, lambda repo: repo.release(key))
+
+    def _run(self, operation):
+        db = self.session_factory()
+        try:
+            return operation(IdempotencyKeyRepo(db))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _record(row) -> Optional[IdempotencyRecord]:
+        if row is None:
+            return None
+        response = None
+        if row.status_code is not None:
+            headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers]
+            response = StoredResponse(row.status_code, headers, row.body)
+        return IdempotencyRecord(row.fingerprint, response)
+
+
+def build_store(name: str) -> IdempotencyStore:
+    if name == "postgres":
+        return PostgresStore()
+    if name != "memory":
+        logger.warning(f"Unknown IDEMPOTENCY_BACKEND '{name}', falling back to in-memory idempotency keys")
+    return InMemoryStore()
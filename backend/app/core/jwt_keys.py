@@ -0,0 +1,115 @@
+"""
+JWT signing keys, parsed once at startup.
+
+Symmetric mode (ALGORITHM=HS256, the default) signs access and refresh tokens
+with SECRET_KEY and REFRESH_SECRET_KEY.
+
+Asymmetric mode (ALGORITHM=ES256, or another ES*/RS* algorithm) loads every
+key found in JWT_KEYS_DIR:
+
+- "<kid>.pem"     private key, can sign and verify
+- "<kid>.pub.pem" public key only, can verify (a retired signing key)
+
+Tokens carry the `kid` of the key that signed them, so several keys can be
+valid at once and the public halves are published at /.well-known/jwks.json
+for other services to verify tokens locally. To rotate: add the new key,
+wait for the JWKS cache to expire everywhere, switch JWT_ACTIVE_KID, then
+replace the old private key by its public half once the tokens it signed
+have expired.
+
+Generate an ES256 key with:
+
+    openssl ecparam -name prime256v1 -genkey -noout -out keys/<kid>.pem
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private: Optional[Key]
+    public: Key
+
+
+class KeyRing:
+    """A set of keys for one token type: the active key signs, any key verifies."""
+
+    def __init__(self, algorithm: str, keys: list[SigningKey], active_kid: str, publish: bool = False):
+        self.algorithm = algorithm
+        self.keys = {key.kid: key for key in keys}
+        if active_kid not in self.keys or self.keys[active_kid].private is None:
+            raise ValueError(f"Active JWT key '{active_kid}' has no private key")
+        self.active = self.keys[active_kid]
+        self.jwks_json = json.dumps(self._jwks() if publish else {"keys": []}).encode()
+
+    def sign(self, claims: dict) -> str:
+        return jwt.encode(claims, self.active.private, algorithm=self.algorithm, headers={"kid": self.active.kid})
+
+    def verify(self, token: str) -> dict:
+        """Decode and verify a token with the key named by its `kid` header; raises JWTError."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        # Tokens issued before kid headers were added were signed with the active key
+        key = self.keys.get(kid) if kid is not None else self.active
+        if key is None:
+            raise JWTError(f"Unknown signing key '{kid}'")
+        return jwt.decode(token, key.public, algorithms=[self.algorithm])
+
+    def _jwks(self) -> dict:
+        keys = []
+        for key in self.keys.values():
+            jwk_dict = key.public.to_dict()
+            jwk_dict.update({"kid": key.kid, "use": "sig", "alg": self.algorithm})
+            keys.append(jwk_dict)
+        return {"keys": keys}
+
+
+def _hmac_keyring(algorithm: str, kid: str, secret: str) -> KeyRing:
+    key = jwk.construct(secret, algorithm)
+    return KeyRing(algorithm, [SigningKey(kid=kid, algorithm=algorithm, private=key, public=key)], kid)
+
+
+def _load_key_dir(algorithm: str, keys_dir: str) -> list[SigningKey]:
+    keys = []
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        if path.name.endswith(".pub.pem"):
+            kid = path.name[: -len(".pub.pem")]
+            public = jwk.construct(path.read_text(), algorithm)
+            keys.append(SigningKey(kid=kid, algorithm=algorithm, private=None, public=public))
+        else:
+            private = jwk.construct(path.read_text(), algorithm)
+            keys.append(SigningKey(kid=path.stem, algorithm=algorithm, private=private, public=private.public_key()))
+    return keys
+
+
+def build_keyrings(
+    algorithm: str,
+    secret_key: Optional[str],
+    refresh_secret_key: Optional[str],
+    keys_dir: Optional[str] = None,
+    active_kid: Optional[str] = None,
+) -> tuple[KeyRing, KeyRing]:
+    """Return the (access, refresh) key rings for the configured algorithm."""
+    if algorithm.startswith("HS"):
+        if not secret_key or not refresh_secret_key:
+            raise ValueError("SECRET_KEY and REFRESH_SECRET_KEY must be set for HMAC signed tokens")
+        return (
+            _hmac_keyring(algorithm, "access", secret_key),
+            _hmac_keyring(algorithm, "refresh", refresh_secret_key),
+        )
+
+    if not keys_dir:
+        raise ValueError(f"JWT_KEYS_DIR must be set for {algorithm} signed tokens")
+    keys = _load_key_dir(algorithm, keys_dir)
+    signing_kids = [key.kid for key in keys if key.private is not None]
+    if not signing_kids:
+        raise ValueError(f"No private keys found in {keys_dir}")
+    # The token `type` claim keeps access and refresh tokens apart, so they share one ring
+    ring = KeyRing(algorithm, keys, active_kid or signing_kids[-1], publish=True)
+    return ring, ring
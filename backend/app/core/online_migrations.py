@@ -0,0 +1,227 @@
+"""
+Alembic operations that change busy tables without blocking traffic.
+
+Plain `op.create_index` locks the table against writes for the whole build,
+and a single `UPDATE` backfilling a column rewrites every row in one long
+transaction. And any DDL that has to wait for a lock blocks every query
+queued behind it. Use these helpers from migration scripts instead:
+
+    from app.core.online_migrations import (
+        backfill_in_batches, create_index_concurrently, set_not_null, with_lock_retry
+    )
+
+    def upgrade() -> None:
+        with_lock_retry(lambda: op.add_column('users', sa.Column('locale', sa.String(), nullable=True)))
+        backfill_in_batches('users', "locale = 'en'", where="locale IS NULL")
+        set_not_null('users', 'locale')
+        create_index_concurrently('ix_users_locale', 'users', ['locale'])
+
+alembic/env.py runs each migration in its own transaction and sets a
+session lock_timeout (MIGRATION_LOCK_TIMEOUT_MS), so a migration fails fast
+rather than stalling the application while it waits for a lock.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Sequence, TypeVar
+
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Under alembic's logger, so progress is printed along with its INFO output
+logger = logging.getLogger("alembic.online_migrations")
+
+T = TypeVar("T")
+
+LOCK_NOT_AVAILABLE = "55P03"
+CHECKPOINT_TABLE = "online_migration_checkpoints"
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def _is_lock_timeout(error: OperationalError) -> bool:
+    return getattr(error.orig, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+@contextmanager
+def _lock_timeout(connection, lock_timeout_ms: int) -> Iterator[None]:
+    """Session-level lock_timeout for autocommit statements, restoring the previous value afterwards."""
+    previous = connection.execute(text("SHOW lock_timeout")).scalar()
+    connection.execute(text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+    try:
+        yield
+    finally:
+        connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": previous})
+
+
+def with_lock_retry(
+    operation: Callable[[], T],
+    lock_timeout_ms: int = 2000,
+    attempts: int = 5,
+    backoff: float = 0.5,
+) -> T:
+    """
+    Run `operation` (usually one `op.*` DDL call) with a short lock_timeout, retrying on timeout.
+
+    Inside the migration's transaction each attempt runs in a savepoint, so
+    a timed-out attempt is rolled back alone; in an autocommit block each
+    attempt is its own transaction. Between attempts the lock queue drains
+    and the application proceeds; waits double from `backoff` seconds.
+    """
+    if _offline():
+        return operation()
+    connection = op.get_bind()
+    autocommit = connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    for attempt in range(1, attempts + 1):
+        try:
+            if autocommit:
+                with _lock_timeout(connection, lock_timeout_ms):
+                    return operation()
+            with connection.begin_nested():
+                connection.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+                return operation()
+        except OperationalError as e:
+            if not _is_lock_timeout(e) or attempt == attempts:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            logger.warning(
+                f"Lock not acquired within {lock_timeout_ms}ms (attempt {attempt}/{attempts}), retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence, **kwargs) -> None:
+    """
+    CREATE INDEX CONCURRENTLY, outside the migration's transaction.
+
+    The table stays readable and writable during the build. A build that
+    failed midway leaves an INVALID index behind; it is dropped and rebuilt,
+    so re-running the migration after a failure is safe.
+    """
+    with op.get_context().autocommit_block():
+        if not _offline():
+            connection = op.get_bind()
+            valid = connection.execute(text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace"
+            ), {"name": index_name}).scalar()
+            if valid is False:
+                logger.warning(f"Dropping invalid index {index_name} left by an interrupted build")
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+            # Waiting for older transactions is part of a concurrent build and blocks nobody
+            with _lock_timeout(connection, 0):
+                op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+            return
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """DROP INDEX CONCURRENTLY, outside the migration's transaction."""
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def set_not_null(table_name: str, column: str) -> None:
+    """
+    ALTER COLUMN ... SET NOT NULL without scanning the table under an exclusive lock.
+
+    A plain SET NOT NULL holds ACCESS EXCLUSIVE while it checks every row.
+    Instead a NOT VALID check constraint is added (instant), validated (a
+    scan that only takes SHARE UPDATE EXCLUSIVE, so reads and writes go on),
+    and SET NOT NULL then relies on it instead of scanning; the constraint
+    is dropped afterwards. Each step is its own transaction, with lock retry.
+    """
+    constraint = f"{table_name}_{column}_not_null"
+    with op.get_context().autocommit_block():
+        with_lock_retry(lambda: op.execute(
+            f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint}, "
+            f"ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"
+        ))
+        with_lock_retry(lambda: op.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint}"))
+        with_lock_retry(lambda: op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column} SET NOT NULL"))
+        with_lock_retry(lambda: op.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT {constraint}"))
+
+
+def backfill_in_batches(
+    table_name: str,
+    set_sql: str,
+    where: str = "true",
+    key: str = "id",
+    batch_size: int = 1000,
+    max_batch_size: int = 10_000,
+    target_batch_seconds: float = 0.2,
+    pause: float = 0.05,
+    checkpoint: Optional[str] = None,
+) -> int:
+    """
+    UPDATE `table_name` SET `set_sql` WHERE `where`, in key order, one short transaction per batch.
+
+    `where` should exclude rows that are already done (e.g. "locale IS NULL")
+    so re-running is harmless. Progress is also checkpointed under
+    `checkpoint` (default: the table and SET clause), so a run that was
+    interrupted resumes after the last committed batch instead of rescanning.
+
+    Throttling: the batch size adapts to keep each batch near
+    `target_batch_seconds` (locks are held that long at most), and the
+    backfill sleeps `pause` seconds between batches to leave room for
+    replication and for the application's own writes. Returns the number of
+    rows updated.
+    """
+    if _offline():
+        op.execute(f"UPDATE {table_name} SET {set_sql} WHERE {where}")
+        return 0
+
+    checkpoint = checkpoint or f"{table_name}:{set_sql}"
+    updated = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        key_type = connection.execute(text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) AND attname = :key"
+        ), {"table": table_name, "key": key}).scalar_one()
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} "
+            "(name text PRIMARY KEY, last_key text NOT NULL, rows bigint NOT NULL, updated_at timestamptz NOT NULL)"
+        ))
+        after = connection.execute(
+            text(f"SELECT last_key FROM {CHECKPOINT_TABLE} WHERE name = :name"), {"name": checkpoint}
+        ).scalar()
+        if after is not None:
+            logger.info(f"Resuming backfill of {table_name} after {key} {after}")
+
+        batch = text(
+            f"WITH batch AS ("
+            f"SELECT {key} AS batch_key FROM {table_name} WHERE (CAST(:after AS {key_type}) IS NULL OR {key} > CAST(:after AS {key_type})) "
+            f"AND ({where}) ORDER BY {key} LIMIT :limit"
+            f") UPDATE {table_name} AS t SET {set_sql} FROM batch WHERE t.{key} = batch.batch_key RETURNING t.{key}"
+        )
+        save = text(
+            f"INSERT INTO {CHECKPOINT_TABLE} (name, last_key, rows, updated_at) VALUES (:name, :last_key, :rows, now()) "
+            "ON CONFLICT (name) DO UPDATE SET last_key = EXCLUDED.last_key, "
+            f"rows = {CHECKPOINT_TABLE}.rows + EXCLUDED.rows, updated_at = now()"
+        )
+        started = time.monotonic()
+        while True:
+            batch_started = time.monotonic()
+            keys = with_lock_retry(lambda: connection.execute(batch, {"after": after, "limit": batch_size}).scalars().all())
+            if not keys:
+                break
+            after = str(max(keys))
+            updated += len(keys)
+            connection.execute(save, {"name": checkpoint, "last_key": after, "rows": len(keys)})
+
+            elapsed = time.monotonic() - batch_started
+            if elapsed > target_batch_seconds * 1.5:
+                batch_size = max(batch_size // 2, 10)
+            elif elapsed < target_batch_seconds / 2:
+                batch_size = min(batch_size * 2, max_batch_size)
+            if time.monotonic() - started > 10:
+                logger.info(f"Backfilled {updated:,} rows of {table_name} so far (batch size {batch_size})")
+                started = time.monotonic()
+            time.sleep(pause)
+
+        connection.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE name = :name"), {"name": checkpoint})
+    logger.info(f"Backfilled {updated:,} rows of {table_name}")
+    return updated
@@ -0,0 +1,92 @@
+"""
+Serving the OpenAPI schema without building it in the request path.
+
+FastAPI builds the schema on the first /openapi.json request by walking every
+route and model, on every worker of every fresh instance. Here the schema
+comes from a snapshot generated at build time (scripts/openapi_snapshot.py),
+loaded when the app is created: with gunicorn's preload the master reads it
+once, and the workers share the serialized and compressed bytes. Without a
+snapshot it is generated on first use, once per worker, and kept.
+"""
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from fastapi import FastAPI, Request, Response
+
+from app.core.compression import available_encoders, compress, negotiate
+from app.core.conditional import ConditionalRequest, etag_for
+from app.core.static_bundle import PRECOMPRESS_LEVELS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SerializedSchema:
+    content: bytes
+    etag: str
+    # content coding -> precompressed bytes
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+
+def render_schema(schema: dict) -> str:
+    """Canonical text of a schema, as written to and compared with the snapshot file."""
+    return json.dumps(schema, indent=2, ensure_ascii=False) + "\n"
+
+
+class OpenApiDocument:
+    """The app's OpenAPI schema, serialized and compressed once per process."""
+
+    def __init__(self, encodings: Iterable[str] = ("br", "zstd", "gzip"), cache_control: str = "public, no-cache"):
+        encoders = available_encoders()
+        self.encodings = [encoding for encoding in encodings if encoding in encoders]
+        self.cache_control = cache_control
+        self._serialized: Optional[SerializedSchema] = None
+        self._lock = threading.Lock()
+
+    def load_snapshot(self, app: FastAPI, path: Union[str, Path]) -> bool:
+        """Serve the snapshot at `path` if it exists; returns whether it did."""
+        path = Path(path)
+        if not path.is_file():
+            logger.info(f"No OpenAPI snapshot at {path}, the schema is generated on first use")
+            return False
+        schema = json.loads(path.read_text())
+        # Title and version come from the deployment, not from the build
+        schema.setdefault("info", {}).update(title=app.title, version=app.version)
+        app.openapi_schema = schema
+        self._serialized = self._serialize(schema)
+        logger.info(f"OpenAPI schema loaded from {path} ({len(self._serialized.content) / 1024:.0f}KiB)")
+        return True
+
+    def serialized(self, app: FastAPI) -> SerializedSchema:
+        if self._serialized is None:
+            with self._lock:
+                if self._serialized is None:
+                    self._serialized = self._serialize(app.openapi())
+        return self._serialized
+
+    def response(self, request: Request, conditional: ConditionalRequest) -> Response:
+        """The schema in the best encoding the client accepts, or a 304 if it has it already."""
+        serialized = self.serialized(request.app)
+        conditional.check(serialized.etag, self.cache_control)
+        headers = dict(conditional.response.headers)
+        if serialized.variants:
+            headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate(request.headers.get("accept-encoding"), list(serialized.variants))
+        if encoding is None:
+            return Response(serialized.content, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(serialized.variants[encoding], media_type="application/json", headers=headers)
+
+    def _serialize(self, schema: dict) -> SerializedSchema:
+        content = json.dumps(schema, separators=(",", ":"), ensure_ascii=False).encode()
+        serialized = SerializedSchema(content=content, etag=etag_for(hashlib.sha256(content).hexdigest()))
+        for encoding in self.encodings:
+            data = compress(content, encoding, PRECOMPRESS_LEVELS[encoding])
+            if len(data) < len(content):
+                serialized.variants[encoding] = data
+        return serialized
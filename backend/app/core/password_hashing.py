@@ -0,0 +1,105 @@
+import logging
+import math
+import time
+from functools import lru_cache
+
+from passlib.context import CryptContext
+from passlib.hash import argon2, bcrypt
+
+from app.core.config import (
+    ARGON2_MAX_TIME_COST,
+    ARGON2_MEMORY_COST_KIB,
+    ARGON2_MIN_TIME_COST,
+    ARGON2_PARALLELISM,
+    BCRYPT_MAX_ROUNDS,
+    BCRYPT_MIN_ROUNDS,
+    PASSWORD_HASH_ROUNDS,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_TARGET_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+def _time_hash(handler, samples: int = 2) -> float:
+    """Best-of-n wall time, in seconds, to hash a password with a configured handler."""
+    best = math.inf
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(_CALIBRATION_PASSWORD)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def calibrate_bcrypt_rounds(target: float, min_rounds: int, max_rounds: int) -> int:
+    """Pick the bcrypt cost whose hash time is closest to, without exceeding, `target` seconds."""
+    elapsed = _time_hash(bcrypt.using(rounds=min_rounds))
+    # Each extra round doubles the work
+    extra = math.floor(math.log2(target / elapsed)) if elapsed < target else 0
+    return max(min(min_rounds + extra, max_rounds), min_rounds)
+
+
+def calibrate_argon2_time_cost(target: float, memory_cost: int, parallelism: int, min_time: int, max_time: int) -> int:
+    """Pick the argon2id time cost hitting `target` seconds with the given memory/parallelism budget."""
+    elapsed = _time_hash(argon2.using(type="ID", memory_cost=memory_cost, parallelism=parallelism, rounds=min_time))
+    # Time cost scales the number of passes over memory roughly linearly
+    time_cost = math.floor(min_time * target / elapsed) if elapsed < target else min_time
+    return max(min(time_cost, max_time), min_time)
+
+
+def _argon2_available() -> bool:
+    try:
+        return argon2.has_backend()
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=1)
+def build_password_context() -> CryptContext:
+    """
+    Build the password CryptContext, calibrating the work factor to this CPU.
+
+    Runs once per process (in the gunicorn master when the app is preloaded).
+    The calibrated cost also becomes the minimum accepted cost, so with
+    deprecated="auto" any weaker hash, or a hash from a non-default scheme,
+    reports needs_update and is upgraded on the user's next login. Hashes
+    stronger than the calibrated cost are never downgraded.
+    """
+    target = PASSWORD_HASH_TARGET_MS / 1000
+    fixed_rounds = int(PASSWORD_HASH_ROUNDS) if PASSWORD_HASH_ROUNDS else None
+
+    scheme = PASSWORD_HASH_SCHEME.lower()
+    if scheme in ("argon2", "argon2id") and not _argon2_available():
+        logger.warning("argon2 requested but argon2-cffi is not installed, falling back to bcrypt")
+        scheme = "bcrypt"
+
+    if scheme in ("argon2", "argon2id"):
+        time_cost = fixed_rounds or calibrate_argon2_time_cost(
+            target, ARGON2_MEMORY_COST_KIB, ARGON2_PARALLELISM, ARGON2_MIN_TIME_COST, ARGON2_MAX_TIME_COST
+        )
+        logger.info(
+            f"Password hashing: argon2id time_cost={time_cost} memory_cost={ARGON2_MEMORY_COST_KIB}KiB "
+            f"parallelism={ARGON2_PARALLELISM}"
+        )
+        return CryptContext(
+            schemes=["argon2", "bcrypt"],
+            deprecated="auto",
+            argon2__type="ID",
+            argon2__memory_cost=ARGON2_MEMORY_COST_KIB,
+            argon2__parallelism=ARGON2_PARALLELISM,
+            argon2__default_rounds=time_cost,
+            argon2__min_rounds=time_cost,
+            argon2__max_rounds=ARGON2_MAX_TIME_COST,
+        )
+
+    rounds = fixed_rounds or calibrate_bcrypt_rounds(target, BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS)
+    logger.info(f"Password hashing: bcrypt rounds={rounds} (target {PASSWORD_HASH_TARGET_MS} ms)")
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=BCRYPT_MAX_ROUNDS,
+    )
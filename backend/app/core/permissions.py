@@ -0,0 +1,25 @@
+from typing import Iterable
+
+from app.models.user import User
+
+ROLE_USER = "user"
+ROLE_SUPERUSER = "superuser"
+
+SCOPE_ADMIN = "admin"
+
+# Scopes granted by each role; they are embedded in access tokens at issue time
+ROLE_SCOPES: dict[str, frozenset[str]] = {
+    ROLE_USER: frozenset({"profile:read", "profile:write"}),
+    ROLE_SUPERUSER: frozenset({"profile:read", "profile:write", SCOPE_ADMIN, "users:read", "users:write"}),
+}
+
+
+def roles_for_user(user: User) -> list[str]:
+    return [ROLE_SUPERUSER] if user.is_superuser else [ROLE_USER]
+
+
+def scopes_for_roles(roles: Iterable[str]) -> list[str]:
+    scopes: set[str] = set()
+    for role in roles:
+        scopes |= ROLE_SCOPES.get(role, frozenset())
+    return sorted(scopes)
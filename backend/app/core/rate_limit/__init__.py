@@ -0,0 +1,25 @@
+from app.core.rate_limit.backends import (
+    InMemoryBackend,
+    LocalSharedStore,
+    Rate,
+    RateLimitBackend,
+    RateLimitResult,
+    SharedStore,
+    SharedStoreBackend,
+)
+from app.core.rate_limit.limiter import RateLimit, RateLimiter, body_field, client_ip, limiter
+
+__all__ = [
+    "InMemoryBackend",
+    "LocalSharedStore",
+    "Rate",
+    "RateLimit",
+    "RateLimitBackend",
+    "RateLimitResult",
+    "RateLimiter",
+    "SharedStore",
+    "SharedStoreBackend",
+    "body_field",
+    "client_ip",
+    "limiter",
+]
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A limit of `limit` hits per `period` seconds."""
+    limit: int
+    period: float
+
+    _UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse a rate such as "5/minute" or "100/hour"."""
+        count, _, unit = value.partition("/")
+        unit = unit.strip().rstrip("s")
+        if unit not in cls._UNITS:
+            raise ValueError(f"Invalid rate limit period in {value!r}")
+        return cls(limit=int(count), period=float(cls._UNITS[unit]))
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a single hit against a rate limit."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the limit is fully available again
+    retry_after: float  # seconds until the next hit would be allowed (0 when allowed)
+
+
+class RateLimitBackend(ABC):
+    """Storage and algorithm for counting hits per key."""
+
+    @abstractmethod
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        """Record one hit for `key` and report whether it is within `rate`."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Token bucket kept in process memory.
+
+    This is the fastest option and needs no infrastructure, but every worker
+    keeps its own buckets, so the effective limit scales with the number of
+    workers and instances. Use it for a single instance or as a first line of
+    defence in front of a shared backend.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, last refill timestamp)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        now = time.monotonic()
+        refill_per_second = rate.limit / rate.period
+        tokens, last = self._buckets.get(key, (float(rate.limit), now))
+        tokens = min(float(rate.limit), tokens + (now - last) * refill_per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            self._evict(now)
+        self._buckets[key] = (tokens, now)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=int(tokens),
+            reset_after=(rate.limit - tokens) / refill_per_second,
+            retry_after=0.0 if allowed else (1 - tokens) / refill_per_second,
+        )
+
+    def _evict(self, now: float) -> None:
+        """Drop buckets that have not been touched for an hour, or the oldest half."""
+        stale = [key for key, (_, last) in self._buckets.items() if now - last > 3600]
+        if not stale:
+            by_age = sorted(self._buckets.items(), key=lambda item: item[1][1])
+            stale = [key for key, _ in by_age[: len(by_age) // 2]]
+        for key in stale:
+            del self._buckets[key]
+
+
+class SharedStore(ABC):
+    """
+    Minimal counter store shared by all workers and instances.
+
+    The interface maps directly onto Redis/Memorystore (INCRBY + EXPIRE, MGET),
+    so a production implementation is a thin adapter around the client.
+    """
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """Increment `key` by one, set its expiry to `ttl` seconds if new, and return the new value."""
+
+    @abstractmethod
+    async def get(self, key: str) -> int:
+        """Return the value stored at `key`, or 0 if missing or expired."""
+
+
+class LocalSharedStore(SharedStore):
+    """In-process fake of a shared store, for local development and tests."""
+
+    def __init__(self):
+        self._values: dict[str, tuple[int, float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def incr(self, key: str, ttl: float) -> int:
+        async with self._lock:
+            now = time.monotonic()
+            value, expires_at = self._values.get(key, (0, now + ttl))
+            if expires_at <= now:
+                value, expires_at = 0, now + ttl
+            self._values[key] = (value + 1, expires_at)
+            return value + 1
+
+    async def get(self, key: str) -> int:
+        value, expires_at = self._values.get(key, (0, 0.0))
+        return value if expires_at > time.monotonic() else 0
+
+
+class SharedStoreBackend(RateLimitBackend):
+    """
+    Sliding window counter on top of a SharedStore.
+
+    Each key keeps a counter for the current and the previous fixed window;
+    the previous one is weighted by how much of it still overlaps the sliding
+    window. That costs two store operations per hit and bounds the error to
+    the rate of change between adjacent windows.
+    """
+
+    def __init__(self, store: SharedStore):
+        self.store = store
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        now = time.time()
+        window = math.floor(now / rate.period)
+        elapsed = (now % rate.period) / rate.period
+
+        previous = await self.store.get(f"{key}:{window - 1}")
+        current = await self.store.incr(f"{key}:{window}", ttl=rate.period * 2)
+
+        weighted = previous * (1 - elapsed) + current
+        allowed = weighted <= rate.limit
+        reset_after = rate.period * (1 - elapsed)
+
+        retry_after = 0.0
+        if not allowed:
+            retry_after = reset_after
+            if previous and current <= rate.limit:
+                # The previous window is still weighing us down; it decays linearly
+                excess = weighted - rate.limit
+                retry_after = min(reset_after, excess / previous * rate.period)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=max(int(rate.limit - weighted), 0),
+            reset_after=reset_after,
+            retry_after=retry_after,
+        )
@@ -0,0 +1,111 @@
+import logging
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import RATE_LIMIT_BACKEND, RATE_LIMIT_ENABLED
+from app.core.forwarded import client_ip_of
+from app.core.rate_limit.backends import (
+    InMemoryBackend,
+    LocalSharedStore,
+    Rate,
+    RateLimitBackend,
+    RateLimitResult,
+    SharedStoreBackend,
+)
+from app.exceptions.rate_limit import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+KeyFunc = Callable[[Request], Awaitable[Optional[str]]]
+
+
+async def client_ip(request: Request) -> Optional[str]:
+    """Client address, from the X-Forwarded-For hop added by our trusted proxy (see client_ip_of)."""
+    return client_ip_of(request)
+
+
+def body_field(field: str) -> KeyFunc:
+    """Key function reading `field` from the (already parsed) form or JSON body, lowercased."""
+    async def key_func(request: Request) -> Optional[str]:
+        try:
+            if request.headers.get("content-type", "").startswith("application/json"):
+                value = (await request.json()).get(field)
+            else:
+                value = (await request.form()).get(field)
+        except Exception:
+            return None
+        return value.strip().lower() if isinstance(value, str) and value.strip() else None
+    return key_func
+
+
+def build_backend(name: str) -> RateLimitBackend:
+    if name == "shared":
+        # Swap LocalSharedStore for a Redis/Memorystore adapter when running several instances
+        return SharedStoreBackend(LocalSharedStore())
+    if name != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{name}', falling back to in-memory rate limiting")
+    return InMemoryBackend()
+
+
+class RateLimiter:
+    """Applies named rate limit rules against a backend."""
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    async def hit(self, scope: str, key: str, rate: Rate) -> RateLimitResult:
+        return await self.backend.hit(f"rl:{scope}:{key}", rate)
+
+
+limiter = RateLimiter(build_backend(RATE_LIMIT_BACKEND), enabled=RATE_LIMIT_ENABLED)
+
+
+class RateLimit:
+    """
+    FastAPI dependency enforcing one or more rate limits on an endpoint.
+
+    Each rule pairs a key function (client IP, account email, ...) with a rate.
+    All rules are checked before the endpoint body runs, so rejected requests
+    never reach password hashing or email sending. The most restrictive result
+    is reported through the RateLimit-* headers.
+
+    Usage:
+
+        login_limit = RateLimit("login", [(client_ip, "20/minute"), (body_field("username"), "5/minute")])
+
+        @router.post("/login", dependencies=[Depends(login_limit)])
+    """
+
+    def __init__(self, name: str, rules: list[tuple[KeyFunc, str]], rate_limiter: RateLimiter = limiter):
+        self.name = name
+        self.rules = [(key_func, Rate.parse(rate)) for key_func, rate in rules]
+        self.limiter = rate_limiter
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        if not self.limiter.enabled:
+            return
+
+        most_restrictive: Optional[RateLimitResult] = None
+        for index, (key_func, rate) in enumerate(self.rules):
+            key = await key_func(request)
+            if key is None:
+                continue
+            result = await self.limiter.hit(f"{self.name}:{index}", key, rate)
+            if not result.allowed:
+                logger.warning(f"Rate limit exceeded for {self.name} (rule {index})")
+                raise RateLimitError(result.retry_after, headers=self._headers(result))
+            if most_restrictive is None or result.remaining < most_restrictive.remaining:
+                most_restrictive = result
+
+        if most_restrictive is not None:
+            response.headers.update(self._headers(most_restrictive))
+
+    @staticmethod
+    def _headers(result: RateLimitResult) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(result.limit),
+            "RateLimit-Remaining": str(result.remaining),
+            "RateLimit-Reset": str(max(int(result.reset_after + 0.999), 0)),
+        }
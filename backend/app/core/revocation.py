@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.core.config import REFRESH_TOKEN_EXPIRE_DAYS, REVOCATION_REFRESH_SECONDS
+from app.core.database import SessionLocal
+from app.repositories.token_revocation import TokenRevocationRepo
+from app.schemas.core.jwt_payload import JWTPayload
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no deletes; rebuild to shrink)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: two 64-bit halves of one digest generate all k positions
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+# (jti or None for a per-user revocation, user id, revoked at, expires at)
+RevocationRow = tuple[Optional[str], str, datetime, datetime]
+
+
+def _merge_cutoff(current: Optional[int], revoked_at: datetime) -> int:
+    # `iat` has one-second resolution; flooring keeps tokens issued in the
+    # same second as the revocation (e.g. an immediate re-login) valid
+    cutoff = math.floor(revoked_at.timestamp())
+    return max(cutoff, current if current is not None else cutoff)
+
+
+class RevocationCache:
+    """
+    Per-worker view of the token_revocations table.
+
+    `is_revoked` answers from memory: the Bloom filter rejects the common case
+    (a token that was never revoked) without touching the exact set, and the
+    exact set removes the filter's false positives. A background task pulls
+    rows recorded since the last refresh, with some overlap to catch rows from
+    transactions that committed late; revocations made by this worker are
+    applied immediately.
+
+    All state belongs to the event loop: the query runs in a thread that only
+    returns rows (and, for the first, full load, builds a complete filter and
+    sets), and everything is applied or swapped in on the loop, so it never
+    races with `add_token` or `is_revoked`.
+    """
+
+    OVERLAP = timedelta(seconds=30)
+
+    def __init__(
+        self,
+        refresh_interval: float = 5.0,
+        bloom_capacity: int = 100_000,
+        max_token_lifetime: timedelta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ):
+        self.refresh_interval = refresh_interval
+        self.bloom_capacity = bloom_capacity
+        # Every token issued before a cutoff older than this has expired anyway
+        self.max_token_lifetime = max_token_lifetime
+        self._bloom = BloomFilter(bloom_capacity)
+        self._jtis: dict[str, float] = {}  # jti -> expiry timestamp
+        self._user_cutoffs: dict[str, int] = {}  # user id -> tokens issued before this are revoked
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, payload: JWTPayload) -> bool:
+        cutoff = self._user_cutoffs.get(payload.sub)
+        if cutoff is not None and (payload.iat is None or payload.iat < cutoff):
+            return True
+        return bool(payload.jti and self._jtis) and payload.jti in self._bloom and payload.jti in self._jtis
+
+    def add_token(self, jti: str, expires_at: datetime) -> None:
+        if len(self._jtis) >= self.bloom_capacity:
+            self._prune()
+        self._jtis[jti] = expires_at.timestamp()
+        self._bloom.add(jti)
+
+    def add_user_cutoff(self, user_id: str, revoked_at: datetime) -> None:
+        self._user_cutoffs[user_id] = _merge_cutoff(self._user_cutoffs.get(user_id), revoked_at)
+
+    async def refresh(self) -> int:
+        """Load revocations recorded since the last refresh."""
+        since = self._watermark - self.OVERLAP if self._watermark else None
+        if since is None:
+            queried_at, rows, bloom, jtis, cutoffs = await asyncio.to_thread(self._load_all)
+            # Merge what this worker revoked while the query ran, then swap
+            for jti, expiry in self._jtis.items():
+                if jti not in jtis:
+                    jtis[jti] = expiry
+                    bloom.add(jti)
+            for user_id, cutoff in self._user_cutoffs.items():
+                cutoffs[user_id] = max(cutoff, cutoffs.get(user_id, cutoff))
+            self._bloom, self._jtis, self._user_cutoffs = bloom, jtis, cutoffs
+        else:
+            queried_at, rows = await asyncio.to_thread(self._fetch, since)
+            for jti, user_id, revoked_at, expires_at in rows:
+                if jti is None:
+                    self.add_user_cutoff(user_id, revoked_at)
+                else:
+                    self.add_token(jti, expires_at)
+            self._prune_cutoffs()
+        # Set even when nothing was found, so an empty table is not loaded in full again next time
+        self._watermark = queried_at
+        return len(rows)
+
+    @staticmethod
+    def _fetch(since: Optional[datetime]) -> tuple[datetime, list[RevocationRow]]:
+        """
+        The database time and the unexpired revocations recorded after `since`, oldest first.
+
+        revoked_at comes from the database clock, so the next watermark does
+        too. Blocking; touches no cache state.
+        """
+        db = SessionLocal()
+        try:
+            queried_at = db.execute(select(func.now())).scalar_one()
+            rows = TokenRevocationRepo(db).list_active(queried_at, revoked_since=since)
+            return queried_at, [(row.jti, str(row.user_id), row.revoked_at, row.expires_at) for row in rows]
+        finally:
+            db.close()
+
+    def _load_all(self) -> tuple[datetime, list[RevocationRow], BloomFilter, dict[str, float], dict[str, int]]:
+        """Every unexpired revocation, and a filter and sets built from them. Blocking; touches no cache state."""
+        queried_at, rows = self._fetch(None)
+        jtis = {jti: expires_at.timestamp() for jti, _, _, expires_at in rows if jti is not None}
+        cutoffs: dict[str, int] = {}
+        for jti, user_id, revoked_at, _ in rows:
+            if jti is None:
+                cutoffs[user_id] = _merge_cutoff(cutoffs.get(user_id), revoked_at)
+        bloom = BloomFilter(max(self.bloom_capacity, 2 * len(jtis)))
+        for jti in jtis:
+            bloom.add(jti)
+        return queried_at, rows, bloom, jtis, cutoffs
+
+    def _prune(self) -> None:
+        """Drop expired entries and swap in a Bloom filter rebuilt from what is left."""
+        now = datetime.now(timezone.utc).timestamp()
+        jtis = {jti: expiry for jti, expiry in self._jtis.items() if expiry > now}
+        capacity = max(self.bloom_capacity, self._bloom.capacity)
+        if len(jtis) >= capacity:
+            capacity *= 2
+        bloom = BloomFilter(capacity)
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom, self._jtis, self.bloom_capacity = bloom, jtis, capacity
+        self._prune_cutoffs()
+
+    def _prune_cutoffs(self) -> None:
+        """Drop per-user cutoffs that no unexpired token can predate."""
+        oldest = (datetime.now(timezone.utc) - self.max_token_lifetime).timestamp()
+        if any(cutoff < oldest for cutoff in self._user_cutoffs.values()):
+            self._user_cutoffs = {user_id: cutoff for user_id, cutoff in self._user_cutoffs.items() if cutoff >= oldest}
+
+    async def start(self) -> None:
+        """
+        Load every active revocation, then refresh in the background.
+
+        The first load is awaited and its errors propagate: until it has run
+        the cache knows of no revocation and would accept revoked tokens, so
+        a worker that cannot load it must not serve requests.
+        """
+        if self._task is None:
+            count = await self.refresh()
+            logger.info(f"Loaded {count} token revocation(s)")
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh token revocations: {e}")
+
+
+revocation_cache = RevocationCache(refresh_interval=REVOCATION_REFRESH_SECONDS)
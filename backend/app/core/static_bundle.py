@@ -0,0 +1,240 @@
+"""
+Serving the built frontend (Vite `dist/`) from the API container.
+
+The bundle is indexed once, when the app is created: every file's bytes,
+content type, ETag and compressed variants are ready before the first
+request, and with gunicorn's preload the master builds the index and the
+workers share it. Requests never touch the filesystem.
+"""
+import hashlib
+import json
+import logging
+import mimetypes
+import mmap
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from app.core.compression import available_encoders, compress, negotiate
+
+logger = logging.getLogger(__name__)
+
+# Vite's content-hashed output names, e.g. index-XWTFos48.js: the name, "-", an 8-character
+# hash. Only matched under the build's assetsDir; files copied from public/ keep their names
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+PRECOMPRESS_LEVELS = {"br": 11, "gzip": 9, "zstd": 19}
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/manifest+json", "image/svg+xml")
+# Files larger than this are memory-mapped rather than read into the heap
+MMAP_THRESHOLD = 1 << 20
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class StaticFile:
+    path: str
+    content: Union[bytes, mmap.mmap]
+    content_type: str
+    etag: str
+    cache_control: str
+    # content coding -> precompressed bytes
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    def variant_etag(self, encoding: str) -> str:
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def _read(path: Path) -> Union[bytes, mmap.mmap]:
+    with path.open("rb") as f:
+        if path.stat().st_size < MMAP_THRESHOLD:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class StaticBundle:
+    """In-memory index of a built frontend directory."""
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        encodings: Iterable[str] = ("br", "zstd", "gzip"),
+        min_compress_size: int = 1024,
+        assets_dir: str = "assets",
+    ):
+        self.root = Path(root).resolve()
+        # Vite's build.assetsDir, the only place it writes hashed names
+        self.assets_prefix = assets_dir.strip("/") + "/"
+        encoders = available_encoders()
+        self.encodings = [encoding for encoding in encodings if encoding in encoders]
+        self.min_compress_size = min_compress_size
+        self.files: dict[str, StaticFile] = {}
+        self._build()
+
+    def get(self, path: str) -> Optional[StaticFile]:
+        return self.files.get(path)
+
+    @property
+    def index(self) -> Optional[StaticFile]:
+        return self.files.get("index.html")
+
+    def _is_hashed(self, name: str) -> bool:
+        return name.startswith(self.assets_prefix) and HASHED_NAME.search(name) is not None
+
+    def _build(self) -> None:
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Frontend build directory {self.root} does not exist")
+        precompressed = {".br": "br", ".gz": "gzip", ".zst": "zstd"}
+        paths = {path for path in self.root.rglob("*") if path.is_file()}
+        originals = sorted(path for path in paths if path.suffix not in precompressed or path.with_suffix("") not in paths)
+
+        built, raw_bytes, variant_bytes = 0, 0, 0
+        for path in originals:
+            name = path.relative_to(self.root).as_posix()
+            content = _read(path)
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=utf-8"
+            digest = hashlib.sha256(content).hexdigest()[:20]
+            static_file = StaticFile(
+                path=name,
+                content=content,
+                content_type=content_type,
+                etag=f'"{digest}-{len(content):x}"',
+                cache_control=IMMUTABLE if self._is_hashed(name) else REVALIDATE,
+            )
+            if content_type.startswith(COMPRESSIBLE_TYPES) and len(content) >= self.min_compress_size:
+                for encoding in self.encodings:
+                    suffix = next(suffix for suffix, coding in precompressed.items() if coding == encoding)
+                    sibling = path.with_name(path.name + suffix)
+                    # Variants from the build (e.g. vite-plugin-compression) win over compressing here
+                    data = sibling.read_bytes() if sibling.is_file() else compress(bytes(content), encoding, PRECOMPRESS_LEVELS[encoding])
+                    if len(data) < len(content):
+                        static_file.variants[encoding] = data
+                        variant_bytes += len(data)
+            self.files[name] = static_file
+            built += 1
+            raw_bytes += len(content)
+        logger.info(
+            f"Frontend bundle {self.root}: {built} files, {raw_bytes / 1024:.0f}KiB "
+            f"+ {variant_bytes / 1024:.0f}KiB precompressed ({', '.join(self.encodings)})"
+        )
+
+
+class SpaStaticFiles:
+    """
+    ASGI app serving a StaticBundle as a single-page application.
+
+    - Hashed assets (under assetsDir) are cached for a year as immutable,
+      while index.html and everything else is revalidated on every use with its ETag
+      (If-None-Match gives a 304).
+    - The best precompressed variant the client accepts is sent, with no
+      compression work at request time.
+    - A single byte range is served from the identity representation. Other
+      range requests, and stale If-Range validators, get the full file.
+    - Paths without a file extension that match no file get index.html, so
+      client-side routes can be deep-linked. Missing files get a 404, and so
+      does anything under `api_prefixes`, since this app only sees paths
+      that no API route matched.
+    """
+
+    def __init__(self, bundle: StaticBundle, api_prefixes: Iterable[str] = ("/api/",)):
+        self.bundle = bundle
+        self.api_prefixes = tuple(api_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        path = scope["path"]
+        if path.startswith(self.api_prefixes):
+            # An API route that does not exist, not a page
+            await self._send_json(send, scope, 404, "Not Found")
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send_json(send, scope, 405, "Method Not Allowed", {"allow": "GET, HEAD"})
+            return
+
+        static_file = self.bundle.get(path.lstrip("/")) if path != "/" else self.bundle.index
+        if static_file is None:
+            if "." in path.rsplit("/", 1)[-1] or self.bundle.index is None:
+                await self._send_json(send, scope, 404, "Not Found")
+                return
+            static_file = self.bundle.index
+        await self._serve(scope, send, static_file)
+
+    async def _serve(self, scope: Scope, send: Send, static_file: StaticFile) -> None:
+        request_headers = Headers(scope=scope)
+        headers = {"cache-control": static_file.cache_control, "content-type": static_file.content_type}
+        if static_file.variants:
+            headers["vary"] = "Accept-Encoding"
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            current = {static_file.etag, *(static_file.variant_etag(encoding) for encoding in static_file.variants)}
+            candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+            matched = current & candidates
+            if "*" in candidates or matched:
+                headers.pop("content-type")
+                etag = next(iter(matched)) if matched else static_file.etag
+                await self._send(send, scope, 304, {**headers, "etag": etag}, b"")
+                return
+
+        content = static_file.content
+        byte_range = self._range(request_headers, static_file)
+        if byte_range == "unsatisfiable":
+            headers["content-range"] = f"bytes */{len(content)}"
+            await self._send(send, scope, 416, headers, b"")
+            return
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update({"etag": static_file.etag, "accept-ranges": "bytes",
+                            "content-range": f"bytes {start}-{end}/{len(content)}"})
+            await self._send(send, scope, 206, headers, content[start:end + 1])
+            return
+
+        encoding = negotiate(request_headers.get("accept-encoding"), list(static_file.variants))
+        headers["accept-ranges"] = "bytes"
+        if encoding is not None:
+            headers.update({"content-encoding": encoding, "etag": static_file.variant_etag(encoding)})
+            await self._send(send, scope, 200, headers, static_file.variants[encoding])
+            return
+        headers["etag"] = static_file.etag
+        await self._send(send, scope, 200, headers, content)
+
+    @staticmethod
+    def _range(request_headers: Headers, static_file: StaticFile):
+        """(start, end) of a satisfiable single range, "unsatisfiable", or None to send the whole file."""
+        header = request_headers.get("range")
+        if not header:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range.strip() != static_file.etag:
+            return None
+        match = RANGE.match(header.strip())
+        if match is None or match.group(1) == match.group(2) == "":
+            return None
+        size = len(static_file.content)
+        first, last = match.groups()
+        if first == "":
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return "unsatisfiable"
+        return start, end
+
+    @classmethod
+    async def _send_json(cls, send: Send, scope: Scope, status: int, detail: str, headers: Optional[dict] = None) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await cls._send(send, scope, status, {"content-type": "application/json", **(headers or {})}, body)
+
+    @staticmethod
+    async def _send(send: Send, scope: Scope, status: int, headers: dict[str, str], body) -> None:
+        raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        if status != 304:
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else bytes(body)})
@@ -0,0 +1,14 @@
+from .loop_lag import LoopLagMonitor, loop_lag_monitor
+from .memory import MemoryMonitor, memory_monitor, read_rss_bytes
+from .profiler import SamplingProfiler, endpoint_routes, profiler
+
+__all__ = [
+    "LoopLagMonitor",
+    "loop_lag_monitor",
+    "MemoryMonitor",
+    "memory_monitor",
+    "read_rss_bytes",
+    "SamplingProfiler",
+    "endpoint_routes",
+    "profiler",
+]
@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from typing import Optional
+
+from app.core.config import LOOP_BLOCK_THRESHOLD_MS, LOOP_LAG_INTERVAL_MS
+from app.core.context import correlation_id_ctx
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Continuously measures event-loop lag and reports blocking calls.
+
+    A heartbeat task sleeps for `interval` and records how late it wakes up;
+    the overshoot is the time the loop spent on something else. A watchdog
+    thread checks the heartbeat, and when it is late by more than `threshold`
+    it captures the loop thread's stack while the blocking call is still
+    running, and logs it with the correlation ID of the task that was running.
+
+    `lag` is the latest sample; `smoothed_lag` is an exponentially weighted
+    average that ignores one-off spikes and suits load-shedding decisions.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.25, window: int = 2048, smoothing: float = 0.2):
+        self.interval = interval
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.smoothed_lag = 0.0
+        self.stalls = 0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._last_beat = time.monotonic()
+        self._beats = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # Live context of each task, so the watchdog can read its correlation ID
+        self._task_contexts: "weakref.WeakKeyDictionary[asyncio.Task, contextvars.Context]" = weakref.WeakKeyDictionary()
+
+    def start(self) -> None:
+        """Start monitoring the running loop. Must be called from the loop thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if self._loop.get_task_factory() is None:
+            self._loop.set_task_factory(self._task_factory)
+
+        self._stopped.clear()
+        self._last_beat = time.monotonic()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._loop is not None and self._loop.get_task_factory() == self._task_factory:
+            self._loop.set_task_factory(None)
+
+    def percentiles(self) -> dict:
+        """Lag percentiles, in milliseconds, over the most recent samples."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "stalls": self.stalls}
+
+        def at(fraction: float) -> float:
+            return round(samples[min(int(fraction * len(samples)), len(samples) - 1)] * 1000, 3)
+
+        return {
+            "samples": len(samples),
+            "p50_ms": at(0.50),
+            "p90_ms": at(0.90),
+            "p99_ms": at(0.99),
+            "max_ms": round(samples[-1] * 1000, 3),
+            "stalls": self.stalls,
+        }
+
+    @property
+    def loop_thread_id(self) -> Optional[int]:
+        return self._loop_thread_id
+
+    def running_task_context(self) -> Optional[contextvars.Context]:
+        """Context of the task the loop is running right now. Safe to call from other threads."""
+        if self._loop is None:
+            return None
+        task = asyncio.current_task(self._loop)
+        try:
+            return self._task_contexts.get(task) if task is not None else None
+        except RuntimeError:
+            # The loop thread resized the mapping while we were reading it
+            return None
+
+    def _task_factory(self, loop, coro, context=None):
+        context = context if context is not None else contextvars.copy_context()
+        task = asyncio.Task(coro, loop=loop, context=context)
+        self._task_contexts[task] = context
+        return task
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(loop.time() - started - self.interval, 0.0)
+            self.smoothed_lag += self.smoothing * (self.lag - self.smoothed_lag)
+            self._samples.append(self.lag)
+            self._last_beat = time.monotonic()
+            self._beats += 1
+
+    def _watch(self) -> None:
+        reported_beat = -1
+        while not self._stopped.wait(self.threshold / 2):
+            late_by = time.monotonic() - self._last_beat - self.interval
+            if late_by < self.threshold or reported_beat == self._beats:
+                continue
+            reported_beat = self._beats
+            self.stalls += 1
+            self._report_stall(late_by)
+
+    def _report_stall(self, late_by: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+
+        context = self.running_task_context()
+        correlation_id = context.get(correlation_id_ctx) if context is not None else None
+
+        logger.warning(
+            f"Event loop blocked for at least {late_by * 1000:.0f} ms",
+            extra={"extra_data": {"correlation_id": correlation_id, "stack": stack}},
+        )
+
+
+loop_lag_monitor = LoopLagMonitor(
+    interval=LOOP_LAG_INTERVAL_MS / 1000,
+    threshold=LOOP_BLOCK_THRESHOLD_MS / 1000,
+)
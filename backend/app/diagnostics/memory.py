@@ -0,0 +1,236 @@
+import asyncio
+import gc
+import linecache
+import logging
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import session as orm_session
+
+from app.core.config import MEMORY_HISTORY_SIZE, MEMORY_SAMPLE_INTERVAL_SECONDS, TRACEMALLOC_MAX_SNAPSHOTS
+from app.exceptions.database import ConflictError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by tracemalloc itself and by the import machinery are noise in a diff
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _read_status_kib(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def read_rss_bytes() -> int | None:
+    """Resident set size of the current process, from /proc."""
+    return _read_status_kib("VmRSS:")
+
+
+def read_peak_rss_bytes() -> int | None:
+    """Highest resident set size of the current process so far, from /proc."""
+    return _read_status_kib("VmHWM:")
+
+
+def _live_sessions(attempts: int = 5) -> list:
+    """
+    Every Session not yet garbage collected, from SQLAlchemy's own weak registry.
+
+    Other threads open and close sessions while the registry is copied, which
+    can fail with "dictionary changed size during iteration"; the copy is
+    retried. The sessions themselves may be in use by their own threads, so
+    callers only read sizes from them, never their state.
+    """
+    for _ in range(attempts - 1):
+        try:
+            return list(orm_session._sessions.values())
+        except RuntimeError:
+            continue
+    return list(orm_session._sessions.values())
+
+
+def _location(traceback: tracemalloc.Traceback, group_by: str) -> str:
+    if group_by == "filename":
+        return traceback[0].filename
+    # Oldest frame first, allocation site last
+    return " > ".join(f"{frame.filename}:{frame.lineno}" for frame in traceback)
+
+
+class MemoryMonitor:
+    """
+    Per-worker memory diagnostics: RSS over time, the garbage collector, live
+    SQLAlchemy sessions, and tracemalloc snapshots on demand.
+
+    A background task records the worker's RSS every `interval` seconds, so
+    slow growth shows up before the instance hits its memory limit. The rest
+    costs nothing until asked for. tracemalloc in particular stays off until
+    started: while tracing, every allocation is recorded (expect Python code
+    to run noticeably slower and use more memory), so start it, take a
+    baseline snapshot, let traffic run, take another and diff the two, then
+    stop it. Everything here is per worker; the responses carry the pid, and
+    requests must reach the same worker to see the same snapshots.
+    """
+
+    def __init__(self, interval: float = 60.0, history: int = 1440, max_snapshots: int = 5):
+        self.interval = interval
+        self.max_snapshots = max_snapshots
+        self._history: deque[tuple[datetime, int]] = deque(maxlen=history)
+        self._snapshots: OrderedDict[str, tuple[datetime, tracemalloc.Snapshot]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0 and read_rss_bytes() is not None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def sample(self) -> None:
+        rss = read_rss_bytes()
+        if rss is not None:
+            self._history.append((datetime.now(timezone.utc), rss))
+
+    def rss_history(self) -> list[dict]:
+        return [{"at": at, "rss_bytes": rss} for at, rss in self._history]
+
+    @staticmethod
+    def gc_stats() -> dict:
+        return {
+            "enabled": gc.isenabled(),
+            "counts": list(gc.get_count()),
+            "thresholds": list(gc.get_threshold()),
+            # Objects moved to the permanent generation by gc.freeze() in the gunicorn master
+            "frozen": gc.get_freeze_count(),
+            "garbage": len(gc.garbage),
+            "generations": gc.get_stats(),
+        }
+
+    @staticmethod
+    def session_stats(top: int = 10) -> dict:
+        """Live sessions in this worker and how many objects each holds in its identity map."""
+        sizes = sorted((len(session.identity_map) for session in _live_sessions()), reverse=True)
+        return {
+            "live": len(sizes),
+            "identity_map_total": sum(sizes),
+            "largest": [{"identity_map": size} for size in sizes[:top]],
+        }
+
+    def tracemalloc_status(self) -> dict:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": self.snapshots(),
+        }
+
+    def snapshots(self) -> list[dict]:
+        with self._lock:
+            return [{"name": name, "taken_at": taken_at} for name, (taken_at, _) in self._snapshots.items()]
+
+    def start_tracing(self, frames: int = 1) -> None:
+        if tracemalloc.is_tracing():
+            raise ConflictError("tracemalloc", "is already tracing in this worker")
+        tracemalloc.start(frames)
+        logger.info(f"tracemalloc started with {frames} frame(s) per allocation")
+
+    def stop_tracing(self) -> None:
+        """Stop tracing and drop the snapshots, which can be large."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+        logger.info("tracemalloc stopped")
+
+    def take_snapshot(self, name: str) -> datetime:
+        """Take a named snapshot, replacing one with the same name; the oldest go beyond `max_snapshots`."""
+        if not tracemalloc.is_tracing():
+            raise ConflictError("tracemalloc", "is not tracing in this worker")
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        taken_at = datetime.now(timezone.utc)
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = (taken_at, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return taken_at
+
+    def diff(self, base: str, target: Optional[str] = None, group_by: str = "lineno", limit: int = 25) -> dict:
+        """
+        Top allocation differences from snapshot `base` to `target` (default:
+        a snapshot taken now), grouped by "lineno", "filename" or "traceback".
+        """
+        with self._lock:
+            if base not in self._snapshots:
+                raise NotFoundError("Snapshot", base)
+            if target is not None and target not in self._snapshots:
+                raise NotFoundError("Snapshot", target)
+            base_snapshot = self._snapshots[base][1]
+            target_snapshot = self._snapshots[target][1] if target is not None else None
+        if target_snapshot is None:
+            if not tracemalloc.is_tracing():
+                raise ConflictError("tracemalloc", "is not tracing in this worker")
+            target_snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+        started = time.perf_counter()
+        stats = target_snapshot.compare_to(base_snapshot, group_by)
+        return {
+            "base": base,
+            "target": target or "now",
+            "group_by": group_by,
+            "size_diff_total": sum(stat.size_diff for stat in stats),
+            "count_diff_total": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "location": _location(stat.traceback, group_by),
+                    "size_diff": stat.size_diff,
+                    "size": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+            "compare_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "rss_bytes": read_rss_bytes(),
+            "peak_rss_bytes": read_peak_rss_bytes(),
+            "rss_history": self.rss_history(),
+            "gc": self.gc_stats(),
+            "sessions": self.session_stats(),
+            "tracemalloc": self.tracemalloc_status(),
+        }
+
+
+memory_monitor = MemoryMonitor(
+    interval=MEMORY_SAMPLE_INTERVAL_SECONDS,
+    history=MEMORY_HISTORY_SIZE,
+    max_snapshots=TRACEMALLOC_MAX_SNAPSHOTS,
+)
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Iterable, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.context import correlation_id_ctx, request_scope_ctx, route_of
+from app.diagnostics.loop_lag import LoopLagMonitor, loop_lag_monitor
+from app.exceptions.database import ConflictError
+
+# Leaf frames of threads that are waiting rather than running: the event loop
+# polling for I/O (uvloop polls in C, under the frame that started the loop),
+# idle thread-pool workers, background threads between ticks
+IDLE_FRAMES = {
+    ("runners.py", "run"),
+    ("base_events.py", "run_until_complete"),
+    ("selectors.py", "select"),
+    ("selectors.py", "poll"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+
+def endpoint_routes(routes: Iterable) -> dict[CodeType, str]:
+    """Code object of every API endpoint function -> "METHOD /path", to attribute thread-pool samples."""
+    endpoints = {}
+    for route in routes:
+        code = getattr(getattr(route, "endpoint", None), "__code__", None)
+        if isinstance(route, APIRoute) and code is not None:
+            endpoints[code] = f"{','.join(sorted(route.methods))} {route.path}"
+    return endpoints
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages/" in filename:
+        return filename.rsplit("site-packages/", 1)[1]
+    if filename.startswith(os.getcwd()):
+        return os.path.relpath(filename)
+    return os.path.basename(filename)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over every thread of this worker, run on demand.
+
+    For the requested duration a thread takes `sys._current_frames()` every
+    `interval` and counts each thread's stack. Nothing is installed the rest
+    of the time (no tracing or profiling hook, no thread), so it costs nothing
+    while idle; while running, each sample holds the GIL for as long as it
+    takes to walk the stacks, a few tens of microseconds.
+
+    Samples are wall-clock: a thread blocked in a C call (a database query,
+    bcrypt) counts as busy. Threads waiting for work (IDLE_FRAMES) are left
+    out unless `include_idle`. Each sample is attributed to a route:
+    - on the event loop thread, from the request context of the task the
+      loop is running (LoopLagMonitor tracks task contexts), which also gives
+      the correlation ID;
+    - on other threads, from the API endpoint function found on the stack,
+      if any, since thread contexts cannot be read from outside.
+    """
+
+    def __init__(self, monitor: LoopLagMonitor = loop_lag_monitor, max_depth: int = 128):
+        self.monitor = monitor
+        self.max_depth = max_depth
+        self._running = threading.Lock()
+        self._labels: dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def profile(
+        self,
+        seconds: float,
+        interval: float = 0.01,
+        endpoints: Optional[dict[CodeType, str]] = None,
+        include_idle: bool = False,
+        top_requests: int = 20,
+    ) -> dict:
+        """Sample for `seconds` and return the aggregated profile. Blocking; run it off the event loop."""
+        if not self._running.acquire(blocking=False):
+            raise ConflictError("Profiler", "is already running in this worker")
+        try:
+            return self._profile(seconds, interval, endpoints or {}, include_idle, top_requests)
+        finally:
+            self._running.release()
+
+    def _profile(self, seconds: float, interval: float, endpoints: dict[CodeType, str], include_idle: bool, top_requests: int) -> dict:
+        own_thread = threading.get_ident()
+        stacks: Counter[tuple[str, tuple[CodeType, ...]]] = Counter()
+        routes: Counter[str] = Counter()
+        requests: Counter[tuple[str, str]] = Counter()
+        ticks, idle = 0, 0
+
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_tick = started
+        while next_tick < deadline:
+            loop_thread = self.monitor.loop_thread_id
+            loop_context = self.monitor.running_task_context()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            ticks += 1
+            for thread_id, frame in frames.items():
+                if thread_id == own_thread:
+                    continue
+                code = frame.f_code
+                if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    idle += 1
+                    continue
+                stack, route = [], None
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(code)
+                    if route is None:
+                        route = endpoints.get(code)
+                    frame = frame.f_back
+                if thread_id == loop_thread and loop_context is not None:
+                    route = route_of(loop_context.get(request_scope_ctx)) or route
+                    correlation_id = loop_context.get(correlation_id_ctx)
+                    if correlation_id is not None:
+                        requests[(correlation_id, route or "")] += 1
+                root = route or f"[{thread_names.get(thread_id, thread_id)}]"
+                stacks[(root, tuple(reversed(stack)))] += 1
+                routes[root] += 1
+            del frames, frame
+            next_tick += interval
+            time.sleep(max(next_tick - time.perf_counter(), 0))
+
+        busy = sum(routes.values())
+        return {
+            "duration_s": round(time.perf_counter() - started, 3),
+            "interval_ms": interval * 1000,
+            "ticks": ticks,
+            "samples": busy,
+            "idle_samples": idle,
+            "routes": [
+                {"route": route, "samples": count, "percent": round(100 * count / busy, 2)}
+                for route, count in routes.most_common()
+            ],
+            "requests": [
+                {"correlation_id": correlation_id, "route": route or None, "samples": count}
+                for (correlation_id, route), count in requests.most_common(top_requests)
+            ],
+            "collapsed": "".join(
+                f"{';'.join([root, *(self._label(code) for code in stack)])} {count}\n"
+                for (root, stack), count in stacks.most_common()
+            ),
+        }
+
+
+profiler = SamplingProfiler()
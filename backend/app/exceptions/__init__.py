@@ -1,9 +1,14 @@
-from app.exceptions.auth import AuthError
+from app.exceptions.auth import AuthError, ForbiddenError
+from app.exceptions.conditional import NotModified
 from app.exceptions.database import ConflictError, DatabaseError, NotFoundError
+from app.exceptions.rate_limit import RateLimitError
 
 __all__ = [
     "AuthError",
     "ConflictError",
     "DatabaseError",
+    "ForbiddenError",
     "NotFoundError",
+    "NotModified",
+    "RateLimitError",
 ]
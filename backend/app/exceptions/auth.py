@@ -3,9 +3,18 @@ from fastapi import HTTPException, status
 
 class AuthError(HTTPException):
     """Custom authentication error"""
-    def __init__(self, detail: str = "Authentication failed"):
+    def __init__(self, detail: str = "Authentication failed", scheme: str = "Bearer"):
         super().__init__(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=detail,
-            headers={"WWW-Authenticate": "Bearer"}
+            headers={"WWW-Authenticate": scheme}
+        )
+
+
+class ForbiddenError(HTTPException):
+    """Authenticated but missing a required permission"""
+    def __init__(self, detail: str = "Not authorized"):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
         )
@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+
+class NotModified(HTTPException):
+    """Raised when the client's cached representation (If-None-Match) is still current"""
+    def __init__(self, etag: str, cache_control: str):
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": cache_control}
+        )
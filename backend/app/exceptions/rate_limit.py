@@ -0,0 +1,13 @@
+import math
+
+from fastapi import HTTPException, status
+
+
+class RateLimitError(HTTPException):
+    """Raised when a client exceeds a rate limit"""
+    def __init__(self, retry_after: float, headers: dict[str, str] | None = None):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={**(headers or {}), "Retry-After": str(max(math.ceil(retry_after), 1))}
+        )
@@ -0,0 +1,12 @@
+from app.jobs.cron import CronExpression
+from app.jobs.scheduler import Every, Job, JobScheduler, scheduler
+# Registers the maintenance jobs with the scheduler
+from app.jobs import maintenance  # noqa: F401
+
+__all__ = [
+    "CronExpression",
+    "Every",
+    "Job",
+    "JobScheduler",
+    "scheduler",
+]
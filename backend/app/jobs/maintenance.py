@@ -0,0 +1,46 @@
+"""Database housekeeping, one batch per call (see JobScheduler)."""
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import JOB_BATCH_SIZE, RESET_PASSWORD_CODE_TTL_SECONDS, UNACTIVATED_ACCOUNT_TTL_SECONDS
+from app.jobs.scheduler import scheduler
+from app.repositories.auth_audit_event import AuthAuditEventRepo
+from app.repositories.idempotency_key import IdempotencyKeyRepo
+from app.repositories.token_revocation import TokenRevocationRepo
+from app.repositories.user import UserRepo
+
+# Monthly audit partitions kept ready ahead of time, so events never land in the default partition
+AUDIT_PARTITIONS_AHEAD = 3
+
+
+@scheduler.job("purge_token_revocations", every=300, batch_size=JOB_BATCH_SIZE)
+def purge_token_revocations(db: Session, batch_size: int) -> int:
+    return TokenRevocationRepo(db).delete_expired(datetime.now(timezone.utc), limit=batch_size)
+
+
+@scheduler.job("purge_idempotency_keys", every=300, batch_size=JOB_BATCH_SIZE)
+def purge_idempotency_keys(db: Session, batch_size: int) -> int:
+    return IdempotencyKeyRepo(db).delete_expired(limit=batch_size)
+
+
+@scheduler.job("expire_reset_password_codes", every=300, batch_size=JOB_BATCH_SIZE)
+def expire_reset_password_codes(db: Session, batch_size: int) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=RESET_PASSWORD_CODE_TTL_SECONDS)
+    return UserRepo(db).expire_reset_codes(issued_before=cutoff, limit=batch_size)
+
+
+@scheduler.job("delete_unactivated_accounts", cron="*/30 * * * *", batch_size=JOB_BATCH_SIZE)
+def delete_unactivated_accounts(db: Session, batch_size: int) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=UNACTIVATED_ACCOUNT_TTL_SECONDS)
+    return UserRepo(db).delete_unactivated(cutoff, limit=batch_size)
+
+
+@scheduler.job("create_audit_partitions", cron="15 3 * * *", max_batches=1)
+def create_audit_partitions(db: Session, batch_size: int) -> int:
+    repo = AuthAuditEventRepo(db)
+    month = date.today().replace(day=1)
+    for _ in range(AUDIT_PARTITIONS_AHEAD + 1):
+        repo.create_month_partition(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    return AUDIT_PARTITIONS_AHEAD + 1
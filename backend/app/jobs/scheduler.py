@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import SCHEDULER_ENABLED
+from app.core.database import SessionLocal, engine
+from app.jobs.cron import CronExpression
+from app.repositories.scheduled_job import ScheduledJobRepo
+
+logger = logging.getLogger(__name__)
+
+# One batch of work: takes a session and a batch size, returns how many items it handled
+BatchFunc = Callable[[Session, int], int]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Every:
+    """Runs every `seconds`, aligned to the epoch so every instance computes the same slots."""
+    seconds: float
+
+    def next_after(self, moment: datetime) -> datetime:
+        elapsed = (moment - EPOCH).total_seconds()
+        return EPOCH + timedelta(seconds=(elapsed // self.seconds + 1) * self.seconds)
+
+
+Schedule = Union[Every, CronExpression]
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0  # slots run by another worker or instance
+    items: int = 0
+    last_items: int = 0
+    last_duration_ms: float = 0.0
+    last_run_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: Schedule
+    batch: BatchFunc
+    batch_size: int = 1000
+    # Upper bound on one run; what is left waits for the next slot
+    max_batches: int = 100
+    stats: JobStats = field(default_factory=JobStats)
+    next_run_at: Optional[datetime] = None
+    running: bool = False
+
+    @property
+    def lock_key(self) -> int:
+        """Stable signed 64-bit advisory lock key derived from the job name."""
+        return int.from_bytes(hashlib.blake2b(f"job:{self.name}".encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class JobScheduler:
+    """
+    Runs registered maintenance jobs on intervals or cron schedules.
+
+    Every worker of every instance runs the scheduler, and they all wake up for
+    the same slots (schedules are absolute, in UTC). For each slot exactly one
+    of them does the work: it has to take the job's session-level
+    `pg_try_advisory_lock`, which also keeps a long run from overlapping the
+    next slot, and then claim the slot in the scheduled_jobs table, so a
+    worker that wakes up late does not repeat a run that already finished.
+    The lock is released by Postgres if the worker dies mid-run.
+
+    A run calls the job's batch function until it handles fewer than
+    `batch_size` items or `max_batches` is reached, committing after each
+    batch, so locks and transactions stay short. Runs execute in a thread.
+    On Cloud Run, jobs only make progress while the instance has CPU; with
+    CPU allocated only during requests, slots can be late or missed.
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, lock_engine: Engine = engine, enabled: bool = True):
+        self.session_factory = session_factory
+        self.lock_engine = lock_engine
+        self.enabled = enabled
+        self.jobs: dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._runs: set[asyncio.Task] = set()
+
+    def add(self, name: str, batch: BatchFunc, every: Optional[float] = None, cron: Optional[str] = None,
+            batch_size: int = 1000, max_batches: int = 100) -> Job:
+        if (every is None) == (cron is None):
+            raise ValueError(f"Job {name} needs exactly one of `every` or `cron`")
+        schedule = Every(every) if every is not None else CronExpression(cron)
+        job = Job(name=name, schedule=schedule, batch=batch, batch_size=batch_size, max_batches=max_batches)
+        self.jobs[name] = job
+        return job
+
+    def job(self, name: str, every: Optional[float] = None, cron: Optional[str] = None,
+            batch_size: int = 1000, max_batches: int = 100):
+        """Decorator registering a batch function as a job."""
+        def register(batch: BatchFunc) -> BatchFunc:
+            self.add(name, batch, every=every, cron=cron, batch_size=batch_size, max_batches=max_batches)
+            return batch
+        return register
+
+    def run_now(self, job: Job, slot: Optional[datetime] = None) -> bool:
+        """Run one slot of `job` if this process wins it; returns whether it ran. Blocking."""
+        slot = slot or datetime.now(timezone.utc)
+        with self.lock_engine.connect() as lock_connection:
+            if not lock_connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}).scalar():
+                job.stats.skipped += 1
+                return False
+            # The lock belongs to the session; do not leave the connection idle in a transaction
+            lock_connection.commit()
+            try:
+                db = self.session_factory()
+                try:
+                    repo = ScheduledJobRepo(db)
+                    if not repo.claim_slot(job.name, slot):
+                        job.stats.skipped += 1
+                        return False
+                    items, error, started = 0, None, time.perf_counter()
+                    try:
+                        for _ in range(job.max_batches):
+                            handled = job.batch(db, job.batch_size)
+                            db.commit()
+                            items += handled
+                            if handled < job.batch_size:
+                                break
+                    except Exception as e:
+                        db.rollback()
+                        error = f"{type(e).__name__}: {e}"
+                    duration_ms = (time.perf_counter() - started) * 1000
+                    repo.record_run(job.name, duration_ms, items, error)
+                finally:
+                    db.close()
+            finally:
+                lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+                lock_connection.commit()
+
+        stats = job.stats
+        stats.runs += 1
+        stats.items += items
+        stats.last_items = items
+        stats.last_duration_ms = duration_ms
+        stats.last_run_at = slot
+        stats.last_error = error
+        if error:
+            stats.failures += 1
+            logger.error(f"Job {job.name} failed after {items} items in {duration_ms:.0f}ms: {error}")
+        else:
+            logger.info(f"Job {job.name}: {items} items in {duration_ms:.0f}ms")
+        return True
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "name": job.name,
+                "schedule": job.schedule.expression if isinstance(job.schedule, CronExpression) else f"every {job.schedule.seconds:g}s",
+                "running": job.running,
+                "next_run_at": job.next_run_at,
+                **asdict(job.stats),
+            }
+            for job in self.jobs.values()
+        ]
+
+    def start(self) -> None:
+        if self._task is None and self.enabled and self.jobs:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop scheduling and wait for runs in progress (their current batch commits or rolls back)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._runs:
+            await asyncio.gather(*self._runs, return_exceptions=True)
+
+    async def _run(self) -> None:
+        now = datetime.now(timezone.utc)
+        for job in self.jobs.values():
+            job.next_run_at = job.schedule.next_after(now)
+        while True:
+            due_at = min(job.next_run_at for job in self.jobs.values())
+            await asyncio.sleep(max((due_at - datetime.now(timezone.utc)).total_seconds(), 0))
+            now = datetime.now(timezone.utc)
+            for job in self.jobs.values():
+                if job.next_run_at > now:
+                    continue
+                slot = job.next_run_at
+                # Slots missed while asleep or busy are skipped, not replayed
+                job.next_run_at = job.schedule.next_after(now)
+                if job.running:
+                    job.stats.skipped += 1
+                    continue
+                task = asyncio.create_task(self._execute(job, slot))
+                self._runs.add(task)
+                task.add_done_callback(self._runs.discard)
+
+    async def _execute(self, job: Job, slot: datetime) -> None:
+        job.running = True
+        try:
+            await asyncio.to_thread(self.run_now, job, slot)
+        except Exception as e:
+            logger.error(f"Job {job.name} could not run: {e}")
+        finally:
+            job.running = False
+
+
+scheduler = JobScheduler(enabled=SCHEDULER_ENABLED)
@@ -1,26 +1,124 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import logging
 from app.core.logging import logger
-from app.core.config import API_VERSION, SERVICE_NAME
+from app.core.config import (
+    ADMISSION_CONTROL_ENABLED,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_LOOP_LAG_MS,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_MS,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    API_VERSION,
+    COMPRESSION_BROTLI_LEVEL,
+    COMPRESSION_ENABLED,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_ZSTD_LEVEL,
+    DOCS_MODE,
+    FRONTEND_DIST_DIR,
+    IDEMPOTENCY_BACKEND,
+    IDEMPOTENCY_ENABLED,
+    IDEMPOTENCY_LOCK_SECONDS,
+    IDEMPOTENCY_PATHS,
+    IDEMPOTENCY_SECRET,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+    OPENAPI_SNAPSHOT,
+    SERVICE_NAME,
+)
+from app.core.audit import audit_log
+from app.core.idempotency import build_store
+from app.core.static_bundle import SpaStaticFiles, StaticBundle
+from app.core.revocation import revocation_cache
+
+# Import diagnostics
+from app.diagnostics import loop_lag_monitor, memory_monitor
+from app.jobs import scheduler
 
 # Import middleware
-from app.middleware import correlation_id_middleware
+from app.middleware import (
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    IdempotencyMiddleware,
+    correlation_id_middleware,
+)
 
 # Import routers
 from app.routes.public import public_router
 from app.routes.private import private_router
 from app.routes.health import health_router
+from app.routes.well_known import well_known_router
+from app.routes.docs import docs_router, openapi_document
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start per-worker background services, and stop them on shutdown."""
+    # Each service is stopped if and once it has started, in reverse order. The exit
+    # stack runs every stop even when an earlier one raises (the error is re-raised after)
+    async with AsyncExitStack() as services:
+        loop_lag_monitor.start()
+        services.callback(loop_lag_monitor.stop)
+        memory_monitor.start()
+        services.callback(memory_monitor.stop)
+        # Fails startup if the revocations cannot be loaded, rather than accept revoked tokens
+        await revocation_cache.start()
+        services.callback(revocation_cache.stop)
+        audit_log.start()
+        services.push_async_callback(audit_log.stop)
+        scheduler.start()
+        services.push_async_callback(scheduler.stop)
+        yield
 
 app = FastAPI(
     title=SERVICE_NAME,
     version=API_VERSION,
+    lifespan=lifespan,
+    # Served by docs_router instead, from the build-time snapshot (see app.core.openapi)
+    openapi_url=None,
 )
 
 # Setup middleware
+# Innermost, so replayed responses still get a fresh correlation ID and pass admission control
+if IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=build_store(IDEMPOTENCY_BACKEND),
+        secret=IDEMPOTENCY_SECRET,
+        paths=IDEMPOTENCY_PATHS,
+        ttl=IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds=IDEMPOTENCY_LOCK_SECONDS,
+        wait_timeout=IDEMPOTENCY_WAIT_SECONDS,
+    )
+
 app.middleware("http")(correlation_id_middleware)
 
+# Registered after the correlation ID middleware so it wraps it (cheap rejection),
+# but before CORS so shed responses still carry CORS headers
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+        max_queue=ADMISSION_MAX_QUEUE,
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+        max_loop_lag=ADMISSION_MAX_LOOP_LAG_MS / 1000,
+        retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
+# Outside everything that produces responses (idempotent replays are stored uncompressed)
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=COMPRESSION_ENCODINGS,
+        levels={"gzip": COMPRESSION_GZIP_LEVEL, "br": COMPRESSION_BROTLI_LEVEL, "zstd": COMPRESSION_ZSTD_LEVEL},
+        minimum_size=COMPRESSION_MIN_SIZE,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific domains
@@ -33,11 +131,23 @@ app.add_middleware(
 app.include_router(public_router)
 app.include_router(private_router)
 app.include_router(health_router)
+app.include_router(well_known_router)
 
+if DOCS_MODE != "disabled":
+    app.include_router(docs_router)
+    openapi_document.load_snapshot(app, OPENAPI_SNAPSHOT)
 
-@app.get("/", include_in_schema=False)
-async def root():
-    return {"status": "ok", "service": SERVICE_NAME, "version": API_VERSION}
+if FRONTEND_DIST_DIR:
+    # The router's fallback rather than a mount: it only sees paths that match no route
+    # at all, so a wrong method on an API route still gets its 405
+    app.router.default = SpaStaticFiles(
+        StaticBundle(FRONTEND_DIST_DIR, encodings=COMPRESSION_ENCODINGS),
+        api_prefixes=("/api/", "/.well-known/"),
+    )
+else:
+    @app.get("/", include_in_schema=False)
+    async def root():
+        return {"status": "ok", "service": SERVICE_NAME, "version": API_VERSION}
 
 
 if __name__ == "__main__":
@@ -1,3 +1,11 @@
+from .admission_control import AdmissionControlMiddleware
+from .compression import CompressionMiddleware
 from .correlation_id import correlation_id_middleware
+from .idempotency import IdempotencyMiddleware
 
-__all__ = ["correlation_id_middleware"]
\ No newline at end of file
+__all__ = [
+    "AdmissionControlMiddleware",
+    "CompressionMiddleware",
+    "IdempotencyMiddleware",
+    "correlation_id_middleware",
+]
@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.diagnostics.loop_lag import LoopLagMonitor, loop_lag_monitor
+
+logger = logging.getLogger(__name__)
+
+# Lower value wins when slots free up
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+DEFAULT_ROUTE_PRIORITIES = {
+    "/health": PRIORITY_CRITICAL,
+    "/api/v1/auth/refresh": PRIORITY_CRITICAL,
+    "/api/v1/auth/register": PRIORITY_LOW,
+    "/api/v1/auth/forgot-password": PRIORITY_LOW,
+}
+
+
+class AdmissionControlMiddleware:
+    """
+    Caps the number of requests a worker processes concurrently.
+
+    Requests beyond `max_in_flight` wait in a bounded priority queue; when a
+    slot frees up the highest-priority (then oldest) waiter gets it. Requests
+    are shed with a 503 and a Retry-After header, instead of piling up until
+    gunicorn's worker timeout, when:
+
+    - the queue is full and the request does not outrank anything queued,
+    - it waited longer than `queue_timeout`,
+    - the event loop lags more than `max_loop_lag` (critical routes excepted).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_in_flight: int = 64,
+        max_queue: int = 128,
+        queue_timeout: float = 2.0,
+        max_loop_lag: float = 0.5,
+        retry_after: int = 2,
+        route_priorities: Optional[dict[str, int]] = None,
+        lag_monitor: LoopLagMonitor = loop_lag_monitor,
+    ):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_loop_lag = max_loop_lag
+        self.retry_after = retry_after
+        self.route_priorities = route_priorities if route_priorities is not None else DEFAULT_ROUTE_PRIORITIES
+
+        self.in_flight = 0
+        self.shed_count = 0
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.lag_monitor = lag_monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.route_priorities.get(scope["path"], PRIORITY_NORMAL)
+
+        if priority != PRIORITY_CRITICAL and self.lag_monitor.smoothed_lag > self.max_loop_lag:
+            await self._shed(send, "event loop lag")
+            return
+
+        if not await self._acquire(priority):
+            await self._shed(send, "queue full or wait timed out")
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> bool:
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            return True
+
+        if len(self._queue) >= self.max_queue and not self._evict_lower_than(priority):
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._queue, entry)
+        queued_at = time.monotonic()
+        try:
+            # The slot is handed over by _release, which increments in_flight for us
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                # Admitted at the same instant we gave up; hand the slot on
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            logger.warning(f"Request shed after waiting {time.monotonic() - queued_at:.2f}s for a slot")
+            return False
+        finally:
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+
+    def _evict_lower_than(self, priority: int) -> bool:
+        """Make room by rejecting the lowest-priority, newest waiter if it ranks below `priority`."""
+        worst = max(self._queue, key=lambda item: (item[0], item[1]))
+        if worst[0] <= priority:
+            return False
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        if not worst[2].done():
+            worst[2].set_result(False)
+        return True
+
+    def _release(self) -> None:
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    async def _shed(self, send: Send, reason: str) -> None:
+        self.shed_count += 1
+        logger.warning(f"Load shedding request: {reason} (in_flight={self.in_flight}, queued={len(self._queue)})")
+        body = json.dumps({"detail": "Server is overloaded, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
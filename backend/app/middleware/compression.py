@@ -0,0 +1,160 @@
+import logging
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import Encoder, available_encoders, negotiate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the client accepts.
+
+    `encodings` lists the codings to offer in order of preference; codings
+    whose library is not installed are skipped. Only responses whose
+    Content-Type starts with one of `compressible_types` are compressed, and
+    only from `minimum_size` bytes: a body sent in one message is compressed
+    in one go and sent identity if that does not make it smaller, while a
+    streamed body is compressed chunk by chunk and each chunk is flushed
+    straight to the client, so nothing is buffered and progressive responses
+    (exports, NDJSON) keep arriving as they are produced.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed static
+    files), partial content and bodiless statuses pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Iterable[str] = ("br", "zstd", "gzip"),
+        levels: Optional[dict[str, int]] = None,
+        minimum_size: int = 1024,
+        compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        encoders = available_encoders()
+        encodings = list(encodings)
+        self.encodings = [encoding for encoding in encodings if encoding in encoders]
+        self.encoders = encoders
+        missing = [encoding for encoding in encodings if encoding not in encoders]
+        logger.info(
+            f"Response compression: {', '.join(self.encodings) or 'none'}"
+            + (f" ({', '.join(missing)} unavailable, install brotli / zstandard to enable)" if missing else "")
+        )
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+        self.minimum_size = minimum_size
+        self.compressible_types = tuple(compressible_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def compressible(self, headers: Headers, status: int) -> bool:
+        return (
+            status >= 200 and status not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(self.compressible_types)
+        )
+
+
+class _CompressingResponder:
+    """Per-response state: holds back the start message until the first body chunk decides the coding."""
+
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: str):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.encoder: Optional[Encoder] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if not self.middleware.compressible(headers, message["status"]):
+                self.passthrough = True
+                await self._send(message)
+                return
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._begin(start, body, more_body)
+            return
+        if self.encoder is None:
+            await self._send(message)
+            return
+        chunk = self.encoder.compress(body) + (self.encoder.flush() if more_body else self.encoder.finish())
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _begin(self, start: Message, body: bytes, more_body: bool) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        if "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+        declared_length = int(headers.get("content-length", -1))
+        if not more_body:
+            compressed = self._compress_all(body) if len(body) >= self.middleware.minimum_size else None
+            if compressed is None or len(compressed) >= len(body):
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            self._set_encoding(headers, len(compressed))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        if 0 <= declared_length < self.middleware.minimum_size:
+            self.passthrough = True
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": body, "more_body": True})
+            return
+        self.encoder = self.middleware.encoders[self.encoding](self.middleware.levels[self.encoding])
+        self._set_encoding(headers, None)
+        await self._send(start)
+        await self._send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body) + self.encoder.flush(),
+            "more_body": True,
+        })
+
+    def _compress_all(self, body: bytes) -> bytes:
+        encoder = self.middleware.encoders[self.encoding](self.middleware.levels[self.encoding])
+        return encoder.compress(body) + encoder.finish()
+
+    def _set_encoding(self, headers: MutableHeaders, length: Optional[int]) -> None:
+        headers["Content-Encoding"] = self.encoding
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        # The representation changed, so a strong validator no longer holds
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
@@ -1,7 +1,8 @@
 import uuid
 from fastapi import Request, Response
 
-from app.core.context import set_correlation_id
+from app.core.context import set_client_ip, set_correlation_id, set_request_scope
+from app.core.forwarded import client_ip_of
 
 CORRELATION_ID_HEADER = "X-Request-ID"
 
@@ -12,12 +13,15 @@ async def correlation_id_middleware(request: Request, call_next) -> Response:
 
     - Extracts existing correlation ID from X-Request-ID header
     - Generates a new UUID if none provided
-    - Sets the ID in context for use in logging
+    - Sets the ID, the client address and the request scope in context for use in logging,
+      auditing and profiling
     - Returns the ID in response headers
     """
     correlation_id = request.headers.get(CORRELATION_ID_HEADER) or str(uuid.uuid4())
 
     set_correlation_id(correlation_id)
+    set_request_scope(request.scope)
+    set_client_ip(client_ip_of(request))
 
     response: Response = await call_next(request)
     response.headers[CORRELATION_ID_HEADER] = correlation_id
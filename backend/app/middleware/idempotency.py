@@ -0,0 +1,192 @@
+import hashlib
+import hmac
+import json
+import logging
+import time
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.idempotency import IdempotencyStore, StoredResponse
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the first response to POST requests that repeat an Idempotency-Key.
+
+    Applies to `paths` only, and only when the client sends the header. The
+    key is scoped to the method, path and Authorization header; the request
+    body is the fingerprint. Both are stored as HMACs under `secret`: the
+    bodies carry passwords, and a plain hash of one could be brute-forced
+    offline from the table. The first request reserves the key and executes;
+    its response is stored for `ttl` seconds and replayed byte for byte, with
+    an `Idempotent-Replayed: true` header, to every duplicate. Duplicates that
+    arrive while the original is still executing wait for it (up to
+    `wait_timeout`, then 409) instead of executing again. Reusing a key with
+    a different body is rejected with 422.
+
+    Server errors and 429s are not stored, so a retry executes again. If the
+    store is unavailable, requests execute as if no key had been sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        secret: str,
+        paths: Iterable[str],
+        ttl: float = 86400.0,
+        lock_seconds: float = 60.0,
+        wait_timeout: float = 10.0,
+    ):
+        self.app = app
+        if not secret:
+            raise ValueError("IdempotencyMiddleware needs a secret (IDEMPOTENCY_SECRET or SECRET_KEY)")
+        self.store = store
+        self.secret = secret.encode()
+        self.paths = frozenset(paths)
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_timeout = wait_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(b"idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key.strip() or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        key = self._digest(b"\n".join([
+            b"key", scope["method"].encode(), scope["path"].encode(), headers.get(b"authorization", b""), idempotency_key,
+        ]))
+        fingerprint = self._digest(b"\n".join([b"fingerprint", headers.get(b"content-type", b""), body]))
+
+        try:
+            claimed = await self._claim(key, fingerprint, send)
+        except Exception as e:
+            logger.error(f"Idempotency store unavailable, executing without replay protection: {e}")
+            await self.app(scope, self._replay_body(body, receive), send)
+            return
+        if claimed:
+            await self._execute(key, scope, self._replay_body(body, receive), send)
+
+    def _digest(self, message: bytes) -> str:
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    async def _claim(self, key: str, fingerprint: str, send: Send) -> bool:
+        """Reserve the key, or answer the request from the stored response; True if the caller must execute."""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            record = await self.store.claim(key, fingerprint, self.lock_seconds)
+            if record is None:
+                return True
+            if record.fingerprint != fingerprint:
+                await self._send_json(send, 422, "Idempotency-Key was already used with a different request body")
+                return False
+            if record.response is not None:
+                await self._replay(send, record.response)
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self._send_json(
+                    send, 409, "A request with this Idempotency-Key is still being processed",
+                    headers=[(b"retry-after", b"1")],
+                )
+                return False
+            # Finished, released or still running: claim again to find out
+            await self.store.wait(key, remaining)
+
+    async def _execute(self, key: str, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self._release(key)
+            raise
+
+        if start is None or start["status"] >= 500 or start["status"] == 429:
+            await self._release(key)
+            return
+        response = StoredResponse(start["status"], list(start.get("headers", [])), b"".join(chunks))
+        try:
+            await self.store.complete(key, response, self.ttl)
+        except Exception as e:
+            logger.error(f"Failed to store idempotent response, retries will execute again: {e}")
+            await self._release(key)
+
+    async def _release(self, key: str) -> None:
+        try:
+            await self.store.release(key)
+        except Exception as e:
+            # The reservation expires after lock_seconds anyway
+            logger.error(f"Failed to release idempotency key: {e}")
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive: Receive) -> Receive:
+        """Hand the already-read body to the app, then fall through to the real channel (disconnects)."""
+        delivered = False
+
+        async def replay() -> Message:
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        return replay
+
+    @staticmethod
+    async def _replay(send: Send, response: StoredResponse) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [*response.headers, (b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": response.body})
+
+    @staticmethod
+    async def _send_json(send: Send, status: int, detail: str, headers: Optional[list] = None) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *(headers or []),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,3 +1,7 @@
 from app.models.user import User
+from app.models.token_revocation import TokenRevocation
+from app.models.auth_audit_event import AuthAuditEvent
+from app.models.idempotency_key import IdempotencyKey
+from app.models.scheduled_job import ScheduledJob
 
-__all__ = [User]
+__all__ = [User, TokenRevocation, AuthAuditEvent, IdempotencyKey, ScheduledJob]
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Boolean, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.core.database import Base
+from app.core.uuid7 import uuid7
+
+
+class AuthAuditEvent(Base):
+    """
+    Security audit trail of authentication events (logins, refreshes, activations, password changes).
+
+    Append-only and range-partitioned by month on `occurred_at`, so old months
+    can be detached or dropped without a bulk DELETE. The primary key includes
+    the partition key, as Postgres requires. There is no foreign key to users:
+    the trail outlives the accounts it mentions.
+    """
+    __tablename__ = "auth_audit_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    occurred_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    event_type = Column(String, nullable=False)
+    success = Column(Boolean, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    email = Column(String, nullable=True)
+    client_ip = Column(String, nullable=True)
+    correlation_id = Column(String, nullable=True)
+    details = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        Index("ix_auth_audit_events_user_id_occurred_at", user_id, occurred_at),
+        Index("ix_auth_audit_events_email_occurred_at", email, occurred_at),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
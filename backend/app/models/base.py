@@ -1,16 +1,20 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy import Column, Integer, DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from datetime import datetime, timezone
 
 from app.core.database import Base
+from app.core.uuid7 import uuid7
 
 
 class BaseModel(Base):
     """Base model class that includes common fields for all models"""
     __abstract__ = True
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    created_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc)) 
\ No newline at end of file
+    # Time-ordered ids keep primary-key inserts at the right edge of the index; older rows keep their v4 ids
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    # Timestamps come from the database clock at statement time; eager_defaults reads them back
+    # with INSERT/UPDATE ... RETURNING instead of a SELECT after the commit
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __mapper_args__ = {"eager_defaults": True}
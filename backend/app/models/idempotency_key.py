@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Responses stored under a client's Idempotency-Key, for replay to retries.
+
+    A row without `status_code` is a reservation held by the request still
+    executing; its `expires_at` is a short lease, so a crashed worker's
+    reservation can be taken over. Once the response is stored `expires_at`
+    moves to the end of the replay TTL. Expired rows can be purged.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSONB, nullable=True)  # [[name, value], ...] as sent
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
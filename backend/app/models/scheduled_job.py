@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, String, Text
+
+from app.core.database import Base
+
+
+class ScheduledJob(Base):
+    """
+    Last run of each scheduled maintenance job, shared by every instance.
+
+    `last_slot` is the scheduled time of the latest run: an instance claims a
+    slot by moving it forward, so each slot runs once however many workers
+    wake up for it.
+    """
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String, primary_key=True)
+    last_slot = Column(DateTime(timezone=True), nullable=True)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+    last_items = Column(BigInteger, nullable=True)
+    last_error = Column(Text, nullable=True)
+    runs = Column(BigInteger, nullable=False, default=0, server_default="0")
+    failures = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import BaseModel
+
+
+class TokenRevocation(BaseModel):
+    """
+    Revoked tokens.
+
+    A row with a `jti` revokes that single token. A row without one revokes
+    every token of the user issued before `revoked_at` ("log out everywhere").
+    Rows can be purged once `expires_at` has passed, since the tokens they
+    cover have expired by then.
+    """
+    __tablename__ = "token_revocations"
+
+    jti = Column(String, nullable=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Index, func
 
 from app.models.base import BaseModel
 
@@ -13,5 +13,22 @@ class User(BaseModel):
     is_active = Column(Boolean, default=False)
     activation_code = Column(String, nullable=True)
     reset_password_code = Column(String, nullable=True)
+    # When the reset code was sent; the code is refused once RESET_PASSWORD_CODE_TTL_SECONDS have passed
+    reset_password_code_issued_at = Column(DateTime(timezone=True), nullable=True)
     last_connected_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Case-insensitive email search: prefix matches use the btree, substring matches the trigram index
+        Index(
+            "ix_users_email_lower",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_trgm",
+            func.lower(email).label("email_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"email_lower": "gin_trgm_ops"},
+        ),
+    )
+
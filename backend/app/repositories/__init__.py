@@ -1,3 +1,31 @@
 from app.repositories.user import UserRepo
+from app.repositories.token_revocation import TokenRevocationRepo
+from app.repositories.auth_audit_event import AuthAuditEventRepo
+from app.repositories.idempotency_key import IdempotencyKeyRepo
+from app.repositories.scheduled_job import ScheduledJobRepo
+from app.repositories.user_loader import (
+    UserLoader,
+    UserSingleFlight,
+    get_read_user_loader,
+    get_user_loader,
+    replica_user_single_flight,
+    user_single_flight,
+)
+from app.repositories.user_snapshot import UserSnapshot, UserSnapshotCache, user_snapshots
 
-__all__ = ["UserRepo"]
\ No newline at end of file
+__all__ = [
+    "UserRepo",
+    "TokenRevocationRepo",
+    "AuthAuditEventRepo",
+    "IdempotencyKeyRepo",
+    "ScheduledJobRepo",
+    "UserLoader",
+    "UserSingleFlight",
+    "get_read_user_loader",
+    "get_user_loader",
+    "replica_user_single_flight",
+    "user_single_flight",
+    "UserSnapshot",
+    "UserSnapshotCache",
+    "user_snapshots",
+]
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Sequence
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models.auth_audit_event import AuthAuditEvent
+
+# Column order of the tuples passed to write_events
+AUDIT_COLUMNS = (
+    "id", "occurred_at", "event_type", "success", "user_id", "email", "client_ip", "correlation_id", "details",
+)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class AuthAuditEventRepo:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write_events(self, rows: Sequence[tuple]) -> int:
+        """
+        Append audit rows (tuples in AUDIT_COLUMNS order) in one statement and commit.
+
+        Uses COPY when the driver supports it (psycopg2), which avoids parsing
+        and planning per row; otherwise one multi-row INSERT.
+        """
+        connection = self.db.connection()
+        cursor = connection.connection.cursor()
+        if hasattr(cursor, "copy_expert"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                *values, details = row
+                writer.writerow([*("" if value is None else value for value in values),
+                                 "" if details is None else json.dumps(details)])
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {AuthAuditEvent.__tablename__} ({', '.join(AUDIT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        else:
+            self.db.execute(insert(AuthAuditEvent), [dict(zip(AUDIT_COLUMNS, row)) for row in rows])
+        self.db.commit()
+        return len(rows)
+
+    def create_month_partition(self, month: date) -> str:
+        """Create the partition holding `month` if it does not exist; returns its name."""
+        start = _month_start(month)
+        name = f"{AuthAuditEvent.__tablename__}_{start:%Y_%m}"
+        self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AuthAuditEvent.__tablename__} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')"
+        ))
+        self.db.commit()
+        return name
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyRepo:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim(self, key: str, fingerprint: str, lock_seconds: float) -> Optional[IdempotencyKey]:
+        """
+        Reserve `key` for a new execution in one statement.
+
+        Returns None when the reservation was made (no row, or only an expired
+        one), otherwise the live row holding the key.
+        """
+        lease = func.now() + timedelta(seconds=lock_seconds)
+        claiming = (
+            insert(IdempotencyKey)
+            .values(key=key, fingerprint=fingerprint, expires_at=lease)
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={
+                    "fingerprint": fingerprint, "status_code": None, "headers": None, "body": None,
+                    "created_at": func.now(), "expires_at": lease,
+                },
+                where=IdempotencyKey.expires_at <= func.now(),
+            )
+            .returning(IdempotencyKey.key)
+        )
+        claimed = self.db.execute(claiming).first() is not None
+        self.db.commit()
+        return None if claimed else self.get(key)
+
+    def get(self, key: str) -> Optional[IdempotencyKey]:
+        statement = select(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at > func.now())
+        return self.db.execute(statement).scalars().first()
+
+    def complete(self, key: str, status_code: int, headers: list[list[str]], body: bytes, ttl: float) -> None:
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status_code=status_code, headers=headers, body=body,
+                    expires_at=func.now() + timedelta(seconds=ttl))
+        )
+        self.db.commit()
+
+    def release(self, key: str) -> None:
+        """Drop a reservation whose execution did not produce a response worth replaying."""
+        self.db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        )
+        self.db.commit()
+
+    def delete_expired(self, limit: Optional[int] = None) -> int:
+        """Delete expired keys, at most `limit` of them."""
+        expired = IdempotencyKey.expires_at <= func.now()
+        if limit is not None:
+            expired = IdempotencyKey.key.in_(select(IdempotencyKey.key).where(expired).limit(limit))
+        deleted = self.db.execute(delete(IdempotencyKey).where(expired)).rowcount
+        self.db.commit()
+        return deleted
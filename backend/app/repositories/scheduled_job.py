@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.scheduled_job import ScheduledJob
+
+
+class ScheduledJobRepo:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim_slot(self, name: str, slot: datetime) -> bool:
+        """Record that `slot` of job `name` is starting; False if it already ran (or is running) elsewhere."""
+        self.db.execute(insert(ScheduledJob).values(name=name).on_conflict_do_nothing(index_elements=[ScheduledJob.name]))
+        claimed = self.db.execute(
+            update(ScheduledJob)
+            .where(ScheduledJob.name == name, or_(ScheduledJob.last_slot.is_(None), ScheduledJob.last_slot < slot))
+            .values(last_slot=slot, last_started_at=func.now())
+            .returning(ScheduledJob.name)
+        ).first() is not None
+        self.db.commit()
+        return claimed
+
+    def record_run(self, name: str, duration_ms: float, items: int, error: Optional[str] = None) -> None:
+        self.db.execute(
+            update(ScheduledJob)
+            .where(ScheduledJob.name == name)
+            .values(
+                last_finished_at=func.now(),
+                last_duration_ms=duration_ms,
+                last_items=items,
+                last_error=error,
+                runs=ScheduledJob.runs + 1,
+                failures=ScheduledJob.failures + (1 if error else 0),
+            )
+        )
+        self.db.commit()
+
+    def list_all(self) -> list[ScheduledJob]:
+        return list(self.db.query(ScheduledJob).order_by(ScheduledJob.name))
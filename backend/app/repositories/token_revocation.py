@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.token_revocation import TokenRevocation
+
+
+class TokenRevocationRepo:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def revoke_token(self, jti: str, user_id: UUID, expires_at: datetime) -> TokenRevocation:
+        revocation = TokenRevocation(jti=jti, user_id=user_id, expires_at=expires_at)
+        self.db.add(revocation)
+        self.db.commit()
+        return revocation
+
+    def revoke_all(self, user_id: UUID, expires_at: datetime) -> TokenRevocation:
+        revocation = TokenRevocation(jti=None, user_id=user_id, expires_at=expires_at)
+        self.db.add(revocation)
+        self.db.commit()
+        return revocation
+
+    def list_active(self, now: datetime, revoked_since: Optional[datetime] = None) -> list[TokenRevocation]:
+        """Unexpired revocations, optionally only those recorded after `revoked_since`."""
+        query = self.db.query(TokenRevocation).filter(TokenRevocation.expires_at > now)
+        if revoked_since is not None:
+            query = query.filter(TokenRevocation.revoked_at > revoked_since)
+        return query.order_by(TokenRevocation.revoked_at).all()
+
+    def delete_expired(self, now: datetime, limit: Optional[int] = None) -> int:
+        """Delete revocations that expired by `now`, at most `limit` of them."""
+        if limit is None:
+            deleted = self.db.query(TokenRevocation).filter(TokenRevocation.expires_at <= now).delete()
+        else:
+            batch = select(TokenRevocation.id).where(TokenRevocation.expires_at <= now).limit(limit)
+            deleted = self.db.execute(delete(TokenRevocation).where(TokenRevocation.id.in_(batch))).rowcount
+        self.db.commit()
+        return deleted
@@ -1,43 +1,146 @@
+from functools import lru_cache
+from sqlalchemy import Select, any_, bindparam, cast, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional, Sequence
 from uuid import UUID
 from app.models.user import User
+from app.repositories.user_snapshot import user_snapshots
 from app.exceptions.database import NotFoundError, ConflictError
 
+
+@lru_cache(maxsize=None)
+def _lookup_statement(attrs: tuple[str, ...]) -> Select:
+    """
+    SELECT ... WHERE <attr> = :<attr> ... LIMIT 1, built once per combination of lookup columns.
+
+    Values are bound at execution time, so every call with the same columns
+    reuses one statement object and hits SQLAlchemy's compiled cache instead
+    of constructing and compiling a new Query.
+    """
+    return select(User).where(*(getattr(User, attr) == bindparam(attr) for attr in attrs)).limit(1)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_get_many_by_ids = select(User).where(User.id == any_(cast(bindparam("ids"), ARRAY(PG_UUID(as_uuid=True)))))
+
+
 class UserRepo:
 
     def __init__(self, db: Session):
         self.db = db
 
     def get(self, **kwargs):
-        query = self.db.query(User)
-        for attr, value in kwargs.items():
-            query = query.filter(getattr(User, attr) == value)
-        return query.first()
-
-    def create(self, email: str, password: str, is_superuser: bool = False):
-        user = User(
-            email=email,
-            password=password,
-            is_superuser=is_superuser
+        statement = _lookup_statement(tuple(sorted(kwargs)))
+        return self.db.execute(statement, kwargs).scalars().first()
+
+    def get_many_by_ids(self, user_ids: Sequence[UUID]) -> list[User]:
+        """Load several users in one query (WHERE id = ANY(:ids)); missing ids are skipped."""
+        return list(self.db.execute(_get_many_by_ids, {"ids": list(user_ids)}).scalars())
+
+    def search_by_email(
+        self,
+        query: str,
+        prefix: bool = False,
+        limit: int = 20,
+        after: Optional[tuple[str, UUID]] = None,
+    ) -> list[User]:
+        """
+        Case-insensitive email search ordered by (lower(email), id), keyset-paginated.
+
+        Prefix matches use ix_users_email_lower (text_pattern_ops), substring
+        matches use the ix_users_email_trgm GIN index; `after` is the
+        (lower(email), id) of the last row of the previous page.
+        """
+        email = func.lower(User.email)
+        pattern = _escape_like(query.lower())
+        pattern = f"{pattern}%" if prefix else f"%{pattern}%"
+        statement = select(User).where(email.like(pattern, escape="\\"))
+        if after is not None:
+            statement = statement.where(tuple_(email, User.id) > tuple_(*after))
+        statement = statement.order_by(email, User.id).limit(limit)
+        return list(self.db.execute(statement).scalars())
+
+    def email_exists(self, email: str) -> bool:
+        return self.db.execute(select(User.id).where(User.email == email).limit(1)).first() is not None
+
+    def create(self, email: str, password: str, is_superuser: bool = False, **kwargs):
+        """
+        Insert a user in one statement; raises ConflictError if the email is taken.
+
+        ON CONFLICT (email) DO NOTHING makes concurrent registrations of the same
+        email race-free: exactly one INSERT returns a row, the others none.
+        """
+        inserting = (
+            insert(User)
+            .values(email=email, password=password, is_superuser=is_superuser, **kwargs)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        self.db.add(user)
+        user = self.db.execute(select(User).from_statement(inserting)).scalars().first()
+        if not user:
+            self.db.rollback()
+            raise ConflictError("Email", "already registered")
         self.db.commit()
-        self.db.refresh(user)
         return user
 
     def update(self, user_id: UUID, **kwargs):
-        user = self.db.query(User).filter(User.id == user_id).first()
+        # One UPDATE ... RETURNING round trip; a user already in the session is refreshed in place
+        returning = update(User).where(User.id == user_id).values(**kwargs).returning(User)
+        statement = select(User).from_statement(returning).execution_options(populate_existing=True)
+        user = self.db.execute(statement).scalars().first()
         if not user:
             raise NotFoundError("User", str(user_id))
-        for attr, value in kwargs.items():
-            setattr(user, attr, value)
         self.db.commit()
-        self.db.refresh(user)
+        user_snapshots.invalidate(user_id)
         return user
 
     def delete(self, user_id: UUID) -> None:
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self.get(id=user_id)
         if not user:
             raise NotFoundError("User", str(user_id))
         self.db.delete(user)
         self.db.commit()
+        user_snapshots.invalidate(user_id)
+
+    def expire_reset_codes(self, issued_before: datetime, limit: int) -> int:
+        """Clear up to `limit` password reset codes issued before `issued_before`."""
+        batch = (
+            select(User.id)
+            .where(User.reset_password_code.is_not(None), User.reset_password_code_issued_at < issued_before)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        user_ids = self.db.execute(
+            update(User)
+            .where(User.id.in_(batch))
+            .values(reset_password_code=None, reset_password_code_issued_at=None)
+            .returning(User.id)
+        ).scalars().all()
+        self.db.commit()
+        for user_id in user_ids:
+            user_snapshots.invalidate(user_id)
+        return len(user_ids)
+
+    def delete_unactivated(self, created_before: datetime, limit: int) -> int:
+        """Delete up to `limit` accounts still waiting for activation that were created before `created_before`."""
+        batch = (
+            select(User.id)
+            .where(
+                User.is_active.is_(False),
+                User.activation_code.is_not(None),
+                User.is_superuser.is_(False),
+                User.created_at < created_before,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        user_ids = self.db.execute(delete(User).where(User.id.in_(batch)).returning(User.id)).scalars().all()
+        self.db.commit()
+        for user_id in user_ids:
+            user_snapshots.invalidate(user_id)
+        return len(user_ids)
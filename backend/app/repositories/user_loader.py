@@ -0,0 +1,129 @@
+import asyncio
+from typing import Iterable, Optional
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import ReadSessionLocal, SessionLocal, get_db, get_read_db
+from app.models.user import User
+from app.repositories.user import UserRepo
+
+
+class UserSingleFlight:
+    """
+    Per-worker deduplication of user lookups.
+
+    While a query for some ids is running, requests asking for the same ids
+    wait for it instead of sending their own. Queries run in a thread on a
+    short-lived session of their own and return detached instances, so a
+    result can be merged into any number of request sessions, and a cancelled
+    request does not cancel the query other requests are waiting on.
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        self._in_flight: dict[UUID, asyncio.Future] = {}
+
+    async def load_many(self, user_ids: Iterable[UUID]) -> dict[UUID, Optional[User]]:
+        user_ids = list(dict.fromkeys(user_ids))
+        missing = [user_id for user_id in user_ids if user_id not in self._in_flight]
+        if missing:
+            fetch = asyncio.ensure_future(asyncio.to_thread(self._fetch, missing))
+            for user_id in missing:
+                self._in_flight[user_id] = fetch
+            fetch.add_done_callback(lambda done: self._finish(done, missing))
+
+        users: dict[UUID, Optional[User]] = {}
+        for fetch in {self._in_flight[user_id] for user_id in user_ids}:
+            users.update(await asyncio.shield(fetch))
+        return {user_id: users.get(user_id) for user_id in user_ids}
+
+    def _fetch(self, user_ids: list[UUID]) -> dict[UUID, User]:
+        db = self.session_factory()
+        try:
+            return {user.id: user for user in UserRepo(db).get_many_by_ids(user_ids)}
+        finally:
+            db.close()
+
+    def _finish(self, fetch: asyncio.Future, user_ids: list[UUID]) -> None:
+        for user_id in user_ids:
+            if self._in_flight.get(user_id) is fetch:
+                del self._in_flight[user_id]
+        if not fetch.cancelled():
+            # Mark the error retrieved even if every waiter was cancelled
+            fetch.exception()
+
+
+user_single_flight = UserSingleFlight()
+replica_user_single_flight = UserSingleFlight(ReadSessionLocal)
+
+
+class UserLoader:
+    """
+    Request-scoped user loader.
+
+    `load` calls made in the same event-loop iteration are batched into one
+    `WHERE id = ANY(:ids)` query and every result is memoized for the rest of
+    the request. Users the request already holds (e.g. the one that just
+    authenticated) can be primed so they are never queried again. Results
+    are attached to the request's session, so they can be updated as usual.
+    """
+
+    def __init__(self, db: Session, single_flight: Optional[UserSingleFlight] = None):
+        self.db = db
+        self.single_flight = single_flight
+        self._cache: dict[UUID, Optional[User]] = {}
+        self._pending: dict[UUID, asyncio.Future] = {}
+
+    def prime(self, user: User) -> None:
+        self._cache[user.id] = user
+
+    def clear(self, user_id: UUID) -> None:
+        self._cache.pop(user_id, None)
+
+    async def load(self, user_id: UUID) -> Optional[User]:
+        if user_id in self._cache:
+            return self._cache[user_id]
+        if user_id not in self._pending:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # Let the other loads issued in this iteration join the batch
+                loop.call_soon(lambda: loop.create_task(self._dispatch()))
+            self._pending[user_id] = loop.create_future()
+        return await asyncio.shield(self._pending[user_id])
+
+    async def load_many(self, user_ids: Iterable[UUID]) -> list[Optional[User]]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    async def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        single_flight = self.single_flight
+        if single_flight is None:
+            # Share replica reads only while this request has not written, so it still sees its own writes
+            reads_from_replica = getattr(self.db, "reads_from_replica", False)
+            single_flight = replica_user_single_flight if reads_from_replica else user_single_flight
+        try:
+            users = await single_flight.load_many(batch)
+        except Exception as e:
+            for waiter in batch.values():
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for user_id, waiter in batch.items():
+            user = users.get(user_id)
+            if user is not None:
+                user = self.db.merge(user, load=False)
+            self._cache[user_id] = user
+            if not waiter.done():
+                waiter.set_result(user)
+
+
+def get_user_loader(db: Session = Depends(get_db)) -> UserLoader:
+    """Dependency returning the request's user loader, bound to the request's session."""
+    return UserLoader(db)
+
+
+def get_read_user_loader(db: Session = Depends(get_read_db)) -> UserLoader:
+    """Same as get_user_loader, for read-only endpoints: lookups may be served by a replica."""
+    return UserLoader(db)
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import USER_SNAPSHOT_MAX_ENTRIES, USER_SNAPSHOT_TTL_SECONDS
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Immutable copy of the user fields served by /me, safe to share across requests."""
+    id: UUID
+    email: str
+    is_superuser: bool
+    is_active: bool
+    last_connected_at: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_superuser=user.is_superuser,
+            is_active=user.is_active,
+            last_connected_at=user.last_connected_at,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserSnapshotCache:
+    """
+    Per-worker LRU of user snapshots, kept for `ttl` seconds.
+
+    UserRepo drops a user's snapshot whenever it writes that user, so this
+    worker sees its own writes immediately; writes made by other workers show
+    up within `ttl`. A `ttl` of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # user id -> (snapshot, expiry timestamp)
+        self._entries: OrderedDict[UUID, tuple[UserSnapshot, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[UserSnapshot]:
+        with self._lock:
+            snapshot, expires_at = self._entries.get(user_id, (None, 0.0))
+            if snapshot is None:
+                return None
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def put(self, user: User) -> UserSnapshot:
+        snapshot = UserSnapshot.from_user(user)
+        if self.ttl <= 0:
+            return snapshot
+        with self._lock:
+            self._entries[user.id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_snapshots = UserSnapshotCache(ttl=USER_SNAPSHOT_TTL_SECONDS, max_entries=USER_SNAPSHOT_MAX_ENTRIES)
@@ -0,0 +1,101 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+from fastapi.responses import HTMLResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBasic, HTTPBasicCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from app.core.auth import Auth, get_superuser
+from app.core.conditional import ConditionalRequest
+from app.core.config import DOCS_MODE, RATE_LIMIT_LOGIN_PER_ACCOUNT, RATE_LIMIT_LOGIN_PER_IP
+from app.core.database import get_db
+from app.core.openapi import OpenApiDocument
+from app.core.rate_limit import RateLimit, client_ip
+from app.exceptions.auth import AuthError, ForbiddenError
+from app.services.auth.auth import AuthService
+
+if DOCS_MODE not in ("public", "auth", "disabled"):
+    raise ValueError(f"DOCS_MODE must be public, auth or disabled, not {DOCS_MODE!r}")
+
+OPENAPI_URL = "/openapi.json"
+SWAGGER_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+
+openapi_document = OpenApiDocument(cache_control="private, no-cache" if DOCS_MODE == "auth" else "public, no-cache")
+
+DOCS_REALM = "API docs"
+
+auth_service = AuthService()
+
+bearer_credentials = HTTPBearer(auto_error=False)
+basic_credentials = HTTPBasic(auto_error=False, realm=DOCS_REALM)
+
+
+async def basic_username(request: Request) -> Optional[str]:
+    credentials = await basic_credentials(request)
+    return credentials.username.strip().lower() if credentials else None
+
+
+# Basic credentials are passwords, limited like logins
+docs_rate_limit = RateLimit("docs", [(client_ip, RATE_LIMIT_LOGIN_PER_IP), (basic_username, RATE_LIMIT_LOGIN_PER_ACCOUNT)])
+
+
+async def get_docs_reader(
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(bearer_credentials),
+    basic: Optional[HTTPBasicCredentials] = Depends(basic_credentials),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Superuser check for the schema in "auth" mode.
+
+    Tools send a superuser access token. Browsers cannot add one to the
+    schema request made by the docs pages, so superuser email and password
+    over HTTP Basic are accepted too: the 401 challenge makes the browser
+    prompt once and resend them.
+    """
+    if bearer is not None:
+        await get_superuser(await Auth.get_current_user(bearer.credentials))
+        return
+    if basic is None:
+        raise AuthError("Not authenticated", scheme=f'Basic realm="{DOCS_REALM}"')
+    user = await run_in_threadpool(auth_service.authenticate_user, db, basic.username, basic.password)
+    if user is None:
+        raise AuthError("Incorrect email or password", scheme=f'Basic realm="{DOCS_REALM}"')
+    if not user.is_superuser:
+        raise ForbiddenError("Not authorized. Missing required permission.")
+
+
+# Mounted by app.main unless DOCS_MODE is "disabled". The pages carry
+# nothing sensitive and stay public; in "auth" mode only the schema is guarded
+docs_router = APIRouter(include_in_schema=False)
+
+
+@docs_router.get(
+    OPENAPI_URL,
+    dependencies=[Depends(docs_rate_limit), Depends(get_docs_reader)] if DOCS_MODE == "auth" else [],
+)
+def openapi(request: Request, conditional: ConditionalRequest = Depends()) -> Response:
+    """The OpenAPI schema, pre-serialized and precompressed."""
+    return openapi_document.response(request, conditional)
+
+
+@docs_router.get("/docs")
+async def swagger_ui(request: Request) -> HTMLResponse:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_swagger_ui_html(
+        openapi_url=root_path + OPENAPI_URL,
+        title=f"{request.app.title} - Swagger UI",
+        oauth2_redirect_url=root_path + SWAGGER_OAUTH2_REDIRECT_URL,
+    )
+
+
+@docs_router.get(SWAGGER_OAUTH2_REDIRECT_URL)
+async def swagger_ui_redirect() -> HTMLResponse:
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@docs_router.get("/redoc")
+async def redoc(request: Request) -> HTMLResponse:
+    root_path = request.scope.get("root_path", "").rstrip("/")
+    return get_redoc_html(openapi_url=root_path + OPENAPI_URL, title=f"{request.app.title} - ReDoc")
@@ -1,6 +1,22 @@
 from fastapi import APIRouter
 
+# Admin controllers
+from app.controllers.admin.diagnostics import diagnostics_router
+from app.controllers.admin.users import users_router
 
 # Private routes that require authentication
 private_router = APIRouter(prefix="/api/v1")
 
+# Worker diagnostics (superuser only)
+private_router.include_router(
+    diagnostics_router,
+    prefix="/admin/diagnostics",
+    tags=["admin"]
+)
+
+# User management (superuser only)
+private_router.include_router(
+    users_router,
+    prefix="/admin/users",
+    tags=["admin"]
+)
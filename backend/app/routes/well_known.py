@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.core.auth import ACCESS_KEYRING
+
+well_known_router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@well_known_router.get("/jwks.json", include_in_schema=False)
+async def jwks() -> Response:
+    """Public keys for verifying access tokens locally (empty when tokens are HMAC signed)."""
+    return Response(
+        content=ACCESS_KEYRING.jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
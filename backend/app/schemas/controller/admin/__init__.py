@@ -0,0 +1,39 @@
+from .allocation_diff import AllocationDiff
+from .audit_log_stats_response import AuditLogStatsResponse
+from .gc_stats import GcStats
+from .loop_lag_response import LoopLagResponse
+from .memory_diff_response import MemoryDiffResponse
+from .memory_stats_response import MemoryStatsResponse
+from .profile_response import ProfileResponse
+from .request_profile import RequestProfile
+from .route_profile import RouteProfile
+from .rss_sample import RssSample
+from .scheduled_job_stats import ScheduledJobStats
+from .scheduled_jobs_response import ScheduledJobsResponse
+from .session_size import SessionSize
+from .session_stats import SessionStats
+from .tracemalloc_response import TracemallocResponse
+from .tracemalloc_snapshot import TracemallocSnapshot
+from .tracemalloc_status import TracemallocStatus
+from .user_search_response import UserSearchResponse
+
+__all__ = [
+    "AllocationDiff",
+    "AuditLogStatsResponse",
+    "GcStats",
+    "LoopLagResponse",
+    "MemoryDiffResponse",
+    "MemoryStatsResponse",
+    "ProfileResponse",
+    "RequestProfile",
+    "RouteProfile",
+    "RssSample",
+    "ScheduledJobStats",
+    "ScheduledJobsResponse",
+    "SessionSize",
+    "SessionStats",
+    "TracemallocResponse",
+    "TracemallocSnapshot",
+    "TracemallocStatus",
+    "UserSearchResponse",
+]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class AllocationDiff(BaseModel):
+    """Schema for the change in memory allocated at one location between two snapshots"""
+    location: str
+    size_diff: int
+    size: int
+    count_diff: int
+    count: int
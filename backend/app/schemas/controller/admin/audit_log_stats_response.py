@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class AuditLogStatsResponse(BaseModel):
+    """Schema for the audit log buffer counters of the worker serving the request"""
+    pid: int
+    enabled: bool
+    recorded: int
+    written: int
+    buffered: int
+    dropped: int
+    failed: int
+    flushes: int
+    last_flush_ms: float
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class GcStats(BaseModel):
+    """Schema for the garbage collector state of a worker"""
+    enabled: bool
+    # Allocations since the last collection of each generation, and the thresholds that trigger one
+    counts: List[int]
+    thresholds: List[int]
+    frozen: int
+    garbage: int
+    # Per generation: collections, collected, uncollectable
+    generations: List[Dict[str, int]]
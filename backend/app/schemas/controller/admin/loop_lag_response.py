@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class LoopLagResponse(BaseModel):
+    """Schema for event-loop lag percentiles of the worker serving the request"""
+    pid: int
+    samples: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    stalls: int
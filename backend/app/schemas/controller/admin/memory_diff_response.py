@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.controller.admin.allocation_diff import AllocationDiff
+
+
+class MemoryDiffResponse(BaseModel):
+    """Schema for the top allocation differences between two tracemalloc snapshots"""
+    pid: int
+    base: str
+    target: str
+    group_by: str
+    size_diff_total: int
+    count_diff_total: int
+    top: List[AllocationDiff]
+    compare_ms: float
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.schemas.controller.admin.gc_stats import GcStats
+from app.schemas.controller.admin.rss_sample import RssSample
+from app.schemas.controller.admin.session_stats import SessionStats
+from app.schemas.controller.admin.tracemalloc_status import TracemallocStatus
+
+
+class MemoryStatsResponse(BaseModel):
+    """Schema for the memory diagnostics of the worker serving the request"""
+    pid: int
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    rss_history: List[RssSample]
+    gc: GcStats
+    sessions: SessionStats
+    tracemalloc: TracemallocStatus
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.controller.admin.request_profile import RequestProfile
+from app.schemas.controller.admin.route_profile import RouteProfile
+
+
+class ProfileResponse(BaseModel):
+    """Schema for a sampling profile of the worker serving the request"""
+    pid: int
+    duration_s: float
+    interval_ms: float
+    ticks: int
+    samples: int
+    idle_samples: int
+    routes: List[RouteProfile]
+    requests: List[RequestProfile]
+    # Collapsed stacks ("frame;frame;frame count" per line), for flamegraph.pl or speedscope
+    collapsed: str
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class RequestProfile(BaseModel):
+    """Schema for the event-loop samples of one request, by correlation ID"""
+    correlation_id: str
+    route: Optional[str] = None
+    samples: int
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class RouteProfile(BaseModel):
+    """Schema for the samples attributed to one route (or to a thread outside any request)"""
+    route: str
+    samples: int
+    percent: float
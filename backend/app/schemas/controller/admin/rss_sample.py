@@ -0,0 +1,8 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class RssSample(BaseModel):
+    """Schema for one resident set size measurement of a worker"""
+    at: datetime
+    rss_bytes: int
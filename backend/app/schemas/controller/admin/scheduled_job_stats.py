@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ScheduledJobStats(BaseModel):
+    """Schema for one scheduled job: this worker's counters and the last run on any instance"""
+    name: str
+    schedule: str
+    running: bool
+    next_run_at: Optional[datetime] = None
+    # Runs of this worker
+    runs: int
+    failures: int
+    skipped: int
+    items: int
+    last_items: int
+    last_duration_ms: float
+    last_run_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # Last run anywhere, from the scheduled_jobs table
+    last_slot: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    total_runs: int = 0
+    total_failures: int = 0
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.controller.admin.scheduled_job_stats import ScheduledJobStats
+
+
+class ScheduledJobsResponse(BaseModel):
+    """Schema for the scheduled jobs as seen by the worker serving the request"""
+    pid: int
+    enabled: bool
+    jobs: List[ScheduledJobStats]
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class SessionSize(BaseModel):
+    """Schema for the objects held by one live SQLAlchemy session"""
+    identity_map: int
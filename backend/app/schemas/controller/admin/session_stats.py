@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.controller.admin.session_size import SessionSize
+
+
+class SessionStats(BaseModel):
+    """Schema for the SQLAlchemy sessions alive in a worker"""
+    live: int
+    identity_map_total: int
+    largest: List[SessionSize]
@@ -0,0 +1,6 @@
+from app.schemas.controller.admin.tracemalloc_status import TracemallocStatus
+
+
+class TracemallocResponse(TracemallocStatus):
+    """Schema for the tracemalloc state of the worker serving the request"""
+    pid: int
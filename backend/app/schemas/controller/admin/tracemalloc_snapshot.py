@@ -0,0 +1,8 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class TracemallocSnapshot(BaseModel):
+    """Schema for a named tracemalloc snapshot kept by a worker"""
+    name: str
+    taken_at: datetime
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.controller.admin.tracemalloc_snapshot import TracemallocSnapshot
+
+
+class TracemallocStatus(BaseModel):
+    """Schema for the tracemalloc state of a worker"""
+    tracing: bool
+    frames: int
+    traced_bytes: int
+    traced_peak_bytes: int
+    overhead_bytes: int
+    snapshots: List[TracemallocSnapshot]
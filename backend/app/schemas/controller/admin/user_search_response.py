@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.schemas.model.user.user_response import UserResponse
+
+
+class UserSearchResponse(BaseModel):
+    """Schema for one page of an admin user search"""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
@@ -10,6 +10,7 @@ from .forgot_password_response import ForgotPasswordResponse
 from .reset_password_request import ResetPasswordRequest
 from .reset_password_response import ResetPasswordResponse
 from .me_response import MeResponse
+from .logout_response import LogoutResponse
 
 __all__ = [
     "LoginResponse",
@@ -24,4 +25,5 @@ __all__ = [
     "ResetPasswordRequest",
     "ResetPasswordResponse",
     "MeResponse",
+    "LogoutResponse",
 ]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class LogoutResponse(BaseModel):
+    """Schema for logout response"""
+    message: str
+    success: bool
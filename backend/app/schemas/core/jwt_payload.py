@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import List, Literal, Optional
 
 
 class JWTPayload(BaseModel):
@@ -7,3 +7,7 @@ class JWTPayload(BaseModel):
     sub: str  # user ID as string
     exp: int  # expiration timestamp
     type: Literal["access", "refresh"]  # token type
+    iat: Optional[int] = None  # issued-at timestamp
+    jti: Optional[str] = None  # unique token ID, used for revocation
+    roles: List[str] = []  # access tokens only
+    scopes: List[str] = []  # access tokens only, derived from roles
@@ -1,3 +1,4 @@
+from .admin_user_create import AdminUserCreate
 from .user_create import UserCreate
 
-__all__ = ["UserCreate"]
+__all__ = ["AdminUserCreate", "UserCreate"]
@@ -0,0 +1,8 @@
+from pydantic import Field
+
+from app.schemas.model.user.user_create import UserCreate
+
+
+class AdminUserCreate(UserCreate):
+    """Schema for a user created by a superuser"""
+    is_superuser: bool = Field(default=False, description="Whether user is a superuser")
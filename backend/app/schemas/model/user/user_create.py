@@ -2,7 +2,6 @@ from pydantic import BaseModel, EmailStr, Field
 
 
 class UserCreate(BaseModel):
-    """Schema for creating a new user"""
+    """Schema for a public registration; accounts created this way are never superusers"""
     email: EmailStr = Field(..., description="User's email address")
     password: str = Field(..., min_length=8, max_length=72, description="User's password (8-72 characters)")
-    is_superuser: bool = Field(default=False, description="Whether user is a superuser")
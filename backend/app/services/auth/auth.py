@@ -1,18 +1,28 @@
 import logging
 import secrets
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from app.core import audit
+from app.core.audit import audit_log
 from app.core.auth import Auth
+from app.core.config import RESET_PASSWORD_CODE_TTL_SECONDS
 from app.core.email_service import EmailService
+from app.core.permissions import roles_for_user
+from app.core.revocation import revocation_cache
 from app.models.user import User
 
 from app.exceptions.database import ConflictError, NotFoundError
 from app.exceptions.auth import AuthError
+from app.repositories.token_revocation import TokenRevocationRepo
 from app.repositories.user import UserRepo
+from app.repositories.user_loader import UserLoader
+from app.repositories.user_snapshot import UserSnapshot, user_snapshots
+from app.schemas.core.jwt_payload import JWTPayload
+from app.schemas.model.user.admin_user_create import AdminUserCreate
 from app.schemas.model.user.user_create import UserCreate
 from app.schemas.controller.login.login_response import LoginResponse
 from app.schemas.controller.login.refresh_response import RefreshResponse
@@ -34,26 +44,26 @@ class AuthService:
         """Generate a random numeric code."""
         return ''.join([str(secrets.randbelow(10)) for _ in range(length)])
 
-    def refresh_access_token(self, db: Session, user_id: str) -> RefreshResponse:
+    async def refresh_access_token(self, loader: UserLoader, user_id: str) -> RefreshResponse:
         """Create a new access token using a refresh token."""
-        user_repo = UserRepo(db)
-        user = user_repo.get(id=UUID(user_id))
+        user = await loader.load(UUID(user_id))
         if not user:
             raise NotFoundError("User", str(user_id))
-        access_token = self.auth.create_access_token(UUID(user_id))
+        # Roles are re-read on every refresh, so role changes apply within one access token lifetime
+        access_token = self.auth.create_access_token(UUID(user_id), roles_for_user(user))
+        audit_log.record(audit.TOKEN_REFRESH, user_id=user.id)
         return RefreshResponse(
             access_token=access_token,
             token_type="bearer",
             expires_in=self.auth.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    def create_tokens(self, db: Session, user_id: UUID) -> LoginResponse:
+    async def create_tokens(self, loader: UserLoader, user_id: UUID) -> LoginResponse:
         """Create both access and refresh tokens for the user."""
-        user_repo = UserRepo(db)
-        user = user_repo.get(id=user_id)
+        user = await loader.load(user_id)
         if not user:
             raise NotFoundError("User", str(user_id))
-        access_token = self.auth.create_access_token(user_id)
+        access_token = self.auth.create_access_token(user_id, roles_for_user(user))
         refresh_token = self.auth.create_refresh_token(user_id)
         return LoginResponse(
             access_token=access_token,
@@ -67,33 +77,42 @@ class AuthService:
         """Authenticate user by email and password. Returns user or None."""
         user_repo = UserRepo(db)
         user = user_repo.get(email=email)
-        if not user or not self.auth.verify_password(password, user.password):
+        if not user:
+            audit_log.record(audit.LOGIN, success=False, email=email, reason="unknown_email")
+            return None
+        is_valid, new_hash = self.auth.verify_and_update(password, user.password)
+        if not is_valid:
+            audit_log.record(audit.LOGIN, success=False, user_id=user.id, email=email, reason="invalid_password")
             return None
         if not user.is_active:
+            audit_log.record(audit.LOGIN, success=False, user_id=user.id, email=email, reason="inactive")
             raise AuthError("Account is not activated. Please check your email for the activation code.")
-        user_repo.update(user.id, last_connected_at=datetime.now())
+        updates = {"last_connected_at": datetime.now()}
+        if new_hash:
+            # Stored hash is weaker than the current policy; upgrade it in the same write
+            updates["password"] = new_hash
+        user_repo.update(user.id, **updates)
+        audit_log.record(audit.LOGIN, user_id=user.id, email=email, rehashed=bool(new_hash))
         return user
 
     def register_user(self, db: Session, user_data: UserCreate) -> User:
         """Register a new user with activation code."""
         user_repo = UserRepo(db)
-        existing_user = user_repo.get(email=user_data.email)
-        if existing_user:
+        # Cheap check so duplicates are rejected before paying for the password hash;
+        # the ON CONFLICT insert still settles concurrent registrations
+        if user_repo.email_exists(user_data.email):
             raise ConflictError("Email", "already registered")
 
         hashed_password = self.auth.get_password_hash(user_data.password)
         activation_code = self._generate_code()
 
-        user = User(
-            email=user_data.email,
-            password=hashed_password,
-            is_superuser=user_data.is_superuser if user_data.is_superuser else False,
+        user = user_repo.create(
+            user_data.email,
+            hashed_password,
+            is_superuser=False,
             is_active=False,
             activation_code=activation_code
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
 
         # Send activation email
         if self.email_service:
@@ -117,9 +136,12 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Account is already activated")
 
         if user.activation_code != activation_code:
+            audit_log.record(audit.ACCOUNT_ACTIVATION, success=False, user_id=user.id, email=email, reason="invalid_code")
             raise HTTPException(status_code=400, detail="Invalid activation code")
 
-        return user_repo.update(user.id, is_active=True, activation_code=None)
+        user = user_repo.update(user.id, is_active=True, activation_code=None)
+        audit_log.record(audit.ACCOUNT_ACTIVATION, user_id=user.id, email=email)
+        return user
 
     def request_password_reset(self, db: Session, email: str) -> None:
         """Request a password reset. Generates reset code if user exists."""
@@ -131,7 +153,7 @@ class AuthService:
             return
 
         reset_code = self._generate_code()
-        user_repo.update(user.id, reset_password_code=reset_code)
+        user_repo.update(user.id, reset_password_code=reset_code, reset_password_code_issued_at=datetime.now(timezone.utc))
 
         # Send password reset email
         if self.email_service:
@@ -147,24 +169,39 @@ class AuthService:
         user = user_repo.get(reset_password_code=code)
 
         if not user:
+            audit_log.record(audit.PASSWORD_RESET, success=False, reason="invalid_code")
+            raise HTTPException(status_code=400, detail="Invalid or expired reset code")
+        issued_at = user.reset_password_code_issued_at
+        if issued_at is None or datetime.now(timezone.utc) - issued_at > timedelta(seconds=RESET_PASSWORD_CODE_TTL_SECONDS):
+            user_repo.update(user.id, reset_password_code=None, reset_password_code_issued_at=None)
+            audit_log.record(audit.PASSWORD_RESET, success=False, user_id=user.id, email=user.email, reason="expired_code")
             raise HTTPException(status_code=400, detail="Invalid or expired reset code")
 
         hashed_password = self.auth.get_password_hash(new_password)
-        return user_repo.update(user.id, password=hashed_password, reset_password_code=None)
+        user = user_repo.update(
+            user.id, password=hashed_password, reset_password_code=None, reset_password_code_issued_at=None
+        )
+        audit_log.record(audit.PASSWORD_RESET, user_id=user.id, email=user.email)
+        return user
 
-    def get_user_by_id(self, db: Session, user_id: UUID) -> User:
+    async def get_user_by_id(self, loader: UserLoader, user_id: UUID) -> User:
         """Get user by ID."""
-        user_repo = UserRepo(db)
-        user = user_repo.get(id=user_id)
+        user = await loader.load(user_id)
         if not user:
             raise NotFoundError("User", str(user_id))
         return user
 
-    def create_user(self, db: Session, user_data: UserCreate) -> User:
+    async def get_user_snapshot(self, loader: UserLoader, user_id: UUID) -> UserSnapshot:
+        """Get the user from this worker's snapshot cache, loading it only on a miss."""
+        snapshot = user_snapshots.get(user_id)
+        if snapshot is None:
+            snapshot = user_snapshots.put(await self.get_user_by_id(loader, user_id))
+        return snapshot
+
+    def create_user(self, db: Session, user_data: AdminUserCreate) -> User:
         """Create a new user (only superusers can do this)."""
         user_repo = UserRepo(db)
-        existing_user = user_repo.get(email=user_data.email)
-        if existing_user:
+        if user_repo.email_exists(user_data.email):
             raise ConflictError("Email", "already registered")
         hashed_password = self.auth.get_password_hash(user_data.password)
         return user_repo.create(user_data.email, hashed_password, user_data.is_superuser)
@@ -183,8 +220,30 @@ class AuthService:
         if not user:
             raise NotFoundError("User", str(user_id))
         if not self.auth.verify_password(current_password, user.password):
+            audit_log.record(audit.PASSWORD_CHANGE, success=False, user_id=user_id, reason="invalid_password")
             raise HTTPException(status_code=400, detail="Current password is incorrect")
         if self.auth.verify_password(new_password, user.password):
             raise HTTPException(status_code=400, detail="New password must be different from current password")
         new_hashed_password = self.auth.get_password_hash(new_password)
-        return user_repo.update(user_id, password=new_hashed_password)
\ No newline at end of file
+        user = user_repo.update(user_id, password=new_hashed_password)
+        audit_log.record(audit.PASSWORD_CHANGE, user_id=user_id)
+        return user
+
+    def logout(self, db: Session, refresh_token: JWTPayload) -> None:
+        """Revoke a single refresh token."""
+        if not refresh_token.jti:
+            # Issued before tokens carried an ID; it can only be revoked with logout_all
+            return
+        expires_at = datetime.fromtimestamp(refresh_token.exp, tz=timezone.utc)
+        TokenRevocationRepo(db).revoke_token(refresh_token.jti, UUID(refresh_token.sub), expires_at)
+        revocation_cache.add_token(refresh_token.jti, expires_at)
+        audit_log.record(audit.LOGOUT, user_id=UUID(refresh_token.sub))
+
+    def logout_all(self, db: Session, user_id: UUID) -> None:
+        """Revoke every access and refresh token issued to the user so far."""
+        now = datetime.now(timezone.utc)
+        # Once the longest-lived token issued before now has expired the row is no longer needed
+        expires_at = now + timedelta(days=self.auth.REFRESH_TOKEN_EXPIRE_DAYS)
+        TokenRevocationRepo(db).revoke_all(user_id, expires_at)
+        revocation_cache.add_user_cutoff(str(user_id), now)
+        audit_log.record(audit.LOGOUT_ALL, user_id=user_id)
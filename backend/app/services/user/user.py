@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.repositories.user import UserRepo
+from app.schemas.controller.admin.user_search_response import UserSearchResponse
+from app.schemas.model.user.user_response import UserResponse
+
+
+class UserService:
+
+    @staticmethod
+    def _encode_cursor(email: str, user_id: UUID) -> str:
+        return base64.urlsafe_b64encode(json.dumps([email.lower(), str(user_id)]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, UUID]:
+        try:
+            email, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return str(email), UUID(user_id)
+        except (binascii.Error, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def search_users(
+        self, db: Session, query: str, prefix: bool, limit: int, cursor: Optional[str] = None
+    ) -> UserSearchResponse:
+        """Search users by email; pass the returned next_cursor to get the following page."""
+        after = self._decode_cursor(cursor) if cursor else None
+        # One extra row tells whether there is a next page
+        users = UserRepo(db).search_by_email(query, prefix=prefix, limit=limit + 1, after=after)
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = self._encode_cursor(users[-1].email, users[-1].id)
+        return UserSearchResponse(
+            items=[UserResponse.model_validate(user) for user in users],
+            next_cursor=next_cursor
+        )
@@ -0,0 +1,128 @@
+# Gunicorn configuration for the API container.
+#
+# Worker count is derived from the CPUs and memory actually available to the
+# container (CPU affinity, cgroup quotas and memory limits) instead of being
+# hardcoded. The app is preloaded in the master and the heap is frozen before
+# forking so workers share its pages copy-on-write.
+#
+# Overrides (environment variables):
+#   WEB_CONCURRENCY       - explicit worker count, skips auto sizing
+#   WORKERS_PER_CPU       - workers per available CPU (default 1)
+#   MAX_WORKERS           - upper bound on auto sized workers (default 8)
+#   WORKER_MEMORY_MB      - expected RSS per worker, used to fit the memory limit (default 256)
+#   MASTER_MEMORY_MB      - memory reserved for the master process (default 128)
+#   PRELOAD_APP           - set to "false" to import the app in each worker instead
+import gc
+import math
+import os
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+graceful_timeout = 30
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+accesslog = "-"
+errorlog = "-"
+
+preload_app = os.getenv("PRELOAD_APP", "true").lower() != "false"
+
+
+def _read_first_line(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> float | None:
+    """Return the CPU quota enforced by the cgroup, in CPUs, if any."""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read_first_line("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    # cgroup v1
+    quota = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cgroup_memory_limit() -> int | None:
+    """Return the memory limit enforced by the cgroup, in bytes, if any."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read_first_line(path)
+        if value and value != "max":
+            limit = int(value)
+            # cgroup v1 reports an "unlimited" sentinel close to 2**63
+            if limit < 1 << 60:
+                return limit
+    return None
+
+
+def available_cpus() -> float:
+    try:
+        cpus: float = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(cpus, 1)
+
+
+def compute_workers() -> int:
+    explicit = os.getenv("WEB_CONCURRENCY")
+    if explicit:
+        return max(int(explicit), 1)
+
+    per_cpu = float(os.getenv("WORKERS_PER_CPU", "1"))
+    max_workers = int(os.getenv("MAX_WORKERS", "8"))
+    workers = max(math.ceil(available_cpus() * per_cpu), 1)
+
+    memory_limit = cgroup_memory_limit()
+    if memory_limit is not None:
+        worker_budget = int(os.getenv("WORKER_MEMORY_MB", "256")) * 1024 * 1024
+        master_budget = int(os.getenv("MASTER_MEMORY_MB", "128")) * 1024 * 1024
+        workers = min(workers, max((memory_limit - master_budget) // worker_budget, 1))
+
+    return max(min(workers, max_workers), 1)
+
+
+workers = compute_workers()
+
+
+def when_ready(server):
+    server.log.info(
+        "Starting %d workers (cpus=%.2f, cgroup_memory=%s, preload=%s)",
+        workers, available_cpus(), cgroup_memory_limit(), preload_app,
+    )
+    if preload_app:
+        # Move everything allocated while importing the app into the permanent
+        # generation so the collector never touches (and copies) those pages.
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+    if preload_app:
+        # Connections opened in the master must not be shared with children.
+        from app.core.database import dispose_engines
+        dispose_engines(close=False)
+
+
+def post_worker_init(worker):
+    from app.diagnostics.memory import read_rss_bytes
+    startup_ms = (time.monotonic() - getattr(worker, "forked_at", time.monotonic())) * 1000
+    rss = read_rss_bytes()
+    worker.log.info(
+        "Worker %s ready in %.1f ms (rss=%s MB)",
+        worker.pid, startup_ms, f"{rss / 1024 / 1024:.1f}" if rss else "n/a",
+    )
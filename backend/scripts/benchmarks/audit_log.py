@@ -0,0 +1,93 @@
+"""
+Measure how many authentication audit events one worker can sustain.
+
+Runs the real AuditLog writer against DB_URL, so run `alembic upgrade head`
+first. For each batch size, `threads` producers call `record` as fast as
+they can for `seconds`. It prints the events recorded and written per
+second, the number of flushes, and the events dropped because the buffer
+was full or lost after failed writes. It also times one INSERT per event as
+a baseline. Every event has the event type "benchmark" and is deleted at
+the end.
+
+Usage (from backend/):
+    python scripts/benchmarks/audit_log.py [seconds] [threads]
+"""
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, text
+
+from app.core.audit import AuditLog
+from app.core.database import SessionLocal, engine
+from app.core.uuid7 import uuid7
+from app.models.auth_audit_event import AuthAuditEvent
+
+EVENT_TYPE = "benchmark"
+BATCH_SIZES = (100, 1000, 5000)
+
+
+async def run(batch_size: int, seconds: float, threads: int) -> dict:
+    audit_log = AuditLog(max_buffer=100_000, batch_size=batch_size, flush_interval=0.2)
+    audit_log.start()
+    deadline = time.monotonic() + seconds
+
+    def produce(worker: int) -> None:
+        while time.monotonic() < deadline:
+            # Same shape as a failed login; sleep(0) lets the writer's thread get the GIL
+            for _ in range(100):
+                audit_log.record(EVENT_TYPE, success=False, email=f"user{worker}@example.com", reason="invalid_password")
+            time.sleep(0)
+
+    started = time.perf_counter()
+    producers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+    for producer in producers:
+        producer.start()
+    while any(producer.is_alive() for producer in producers):
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    written_in_time = audit_log.written
+    await audit_log.stop()
+    stats = audit_log.stats()
+    stats["recorded_per_s"] = stats["recorded"] / elapsed
+    stats["written_per_s"] = written_in_time / elapsed
+    return stats
+
+
+def single_inserts(count: int) -> float:
+    """Events per second with one INSERT and commit per event, as a synchronous call in AuthService would do."""
+    db = SessionLocal()
+    started = time.perf_counter()
+    for _ in range(count):
+        db.execute(insert(AuthAuditEvent).values(
+            id=uuid7(), occurred_at=datetime.now(timezone.utc), event_type=EVENT_TYPE, success=False,
+            email="user@example.com", details={"reason": "invalid_password"},
+        ))
+        db.commit()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return count / elapsed
+
+
+def main(seconds: float, threads: int) -> None:
+    print(f"{threads} producer threads, {seconds:.0f}s per run\n")
+    print(f"{'batch':>6} {'recorded/s':>12} {'written/s':>12} {'flushes':>8} {'dropped':>10} {'failed':>7}")
+    for batch_size in BATCH_SIZES:
+        stats = asyncio.run(run(batch_size, seconds, threads))
+        print(
+            f"{batch_size:>6} {stats['recorded_per_s']:>12,.0f} {stats['written_per_s']:>12,.0f} "
+            f"{stats['flushes']:>8,} {stats['dropped']:>10,} {stats['failed']:>7,}"
+        )
+    print(f"\nOne INSERT per event: {single_inserts(2000):,.0f} events/s")
+
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM auth_audit_events WHERE event_type = :type"), {"type": EVENT_TYPE})
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 10.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,99 @@
+"""
+CPU cost versus bytes saved for each response coding and level.
+
+Compresses representative API payloads with every installed coding (gzip
+always; br and zstd with the brotli / zstandard packages) at several levels.
+For each one it prints the compressed size, the ratio, the CPU time per
+response and the throughput. It then compresses a streamed NDJSON export
+the way CompressionMiddleware does, flushing after each chunk, to show what
+streaming costs compared with compressing the whole body at once.
+
+Usage (from backend/):
+    python scripts/benchmarks/compression.py [users]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.compression import available_encoders
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+STREAM_CHUNK = 4096
+
+
+def users(count: int) -> list[dict]:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"user{i}@example.com",
+            "is_active": i % 7 != 0,
+            "is_superuser": i % 97 == 0,
+            "created_at": (created + timedelta(minutes=i)).isoformat(),
+            "updated_at": (created + timedelta(minutes=i, seconds=i % 3600)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def timed(function, minimum_seconds: float = 0.2) -> tuple[bytes, float]:
+    """Run `function` repeatedly for at least `minimum_seconds`; return its result and seconds per call."""
+    runs, started = 0, time.perf_counter()
+    while True:
+        result = function()
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= minimum_seconds:
+            return result, elapsed / runs
+
+
+def one_shot(factory, level: int, body: bytes) -> bytes:
+    encoder = factory(level)
+    return encoder.compress(body) + encoder.finish()
+
+
+def streamed(factory, level: int, chunks: list[bytes]) -> bytes:
+    encoder = factory(level)
+    output = [encoder.compress(chunk) + encoder.flush() for chunk in chunks]
+    return b"".join(output) + encoder.finish()
+
+
+def main(count: int) -> None:
+    encoders = available_encoders()
+    missing = [name for name in LEVELS if name not in encoders]
+    page = json.dumps({"items": users(100), "next_cursor": "eyJlIjogInVzZXIxMDBAZXhhbXBsZS5jb20ifQ"}).encode()
+    export = json.dumps(users(count)).encode()
+    payloads = [("users page (100)", page), (f"export ({count:,})", export)]
+    if missing:
+        print(f"Not installed: {', '.join(missing)}\n")
+
+    print(f"{'payload':<18} {'coding':<8} {'size':>10} {'ratio':>7} {'CPU/resp':>10} {'MB/s':>8}")
+    for name, body in payloads:
+        print(f"{name:<18} {'identity':<8} {len(body):>10,}")
+        for encoding, factory in encoders.items():
+            for level in LEVELS[encoding]:
+                compressed, seconds = timed(lambda: one_shot(factory, level, body))
+                print(
+                    f"{'':<18} {f'{encoding}-{level}':<8} {len(compressed):>10,} {len(body) / len(compressed):>6.1f}x "
+                    f"{seconds * 1000:>8.2f}ms {len(body) / seconds / 2**20:>8.0f}"
+                )
+
+    lines = [json.dumps(user).encode() + b"\n" for user in users(count)]
+    body = b"".join(lines)
+    chunks = [body[offset:offset + STREAM_CHUNK] for offset in range(0, len(body), STREAM_CHUNK)]
+    print(f"\nStreamed NDJSON export, {len(chunks):,} chunks of {STREAM_CHUNK:,} bytes, flushed after each")
+    print(f"{'coding':<8} {'one-shot':>10} {'streamed':>10} {'overhead':>9} {'CPU one-shot':>13} {'CPU streamed':>13}")
+    for encoding, factory in encoders.items():
+        level = LEVELS[encoding][1]
+        whole, whole_seconds = timed(lambda: one_shot(factory, level, body))
+        stream, stream_seconds = timed(lambda: streamed(factory, level, chunks))
+        print(
+            f"{f'{encoding}-{level}':<8} {len(whole):>10,} {len(stream):>10,} {len(stream) / len(whole) - 1:>8.1%} "
+            f"{whole_seconds * 1000:>11.1f}ms {stream_seconds * 1000:>11.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,63 @@
+"""
+Compare JWT sign/verify throughput for HS256 and ES256.
+
+Measures both the old pattern (raw secret/PEM string handed to jwt.encode and
+jwt.decode, parsed on every call) and the preloaded key objects used by
+app.core.jwt_keys.
+
+Usage (from backend/):
+    python scripts/benchmarks/jwt_sign_verify.py [iterations]
+"""
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+
+CLAIMS = {"sub": "7b0a3a4e-8f3c-4a55-9a53-3c2f0d7f1e10", "exp": 4102444800, "type": "access"}
+
+
+def ops_per_second(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations: int) -> None:
+    secret = "benchmark-secret-key"
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+    hs_key = jwk.construct(secret, "HS256")
+    es_key = jwk.construct(pem, "ES256")
+    es_public = es_key.public_key()
+
+    hs_token = jwt.encode(CLAIMS, secret, algorithm="HS256")
+    es_token = jwt.encode(CLAIMS, pem, algorithm="ES256")
+
+    cases = [
+        ("HS256 sign   (raw secret)", lambda: jwt.encode(CLAIMS, secret, algorithm="HS256")),
+        ("HS256 sign   (preloaded)", lambda: jwt.encode(CLAIMS, hs_key, algorithm="HS256")),
+        ("HS256 verify (raw secret)", lambda: jwt.decode(hs_token, secret, algorithms=["HS256"])),
+        ("HS256 verify (preloaded)", lambda: jwt.decode(hs_token, hs_key, algorithms=["HS256"])),
+        ("ES256 sign   (raw PEM)", lambda: jwt.encode(CLAIMS, pem, algorithm="ES256")),
+        ("ES256 sign   (preloaded)", lambda: jwt.encode(CLAIMS, es_key, algorithm="ES256")),
+        ("ES256 verify (raw PEM)", lambda: jwt.decode(es_token, public_pem, algorithms=["ES256"])),
+        ("ES256 verify (preloaded)", lambda: jwt.decode(es_token, es_public, algorithms=["ES256"])),
+    ]
+
+    print(f"{'case':<28}{'ops/s':>12}{'us/op':>10}")
+    for name, func in cases:
+        rate = ops_per_second(func, iterations)
+        print(f"{name:<28}{rate:>12,.0f}{1_000_000 / rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
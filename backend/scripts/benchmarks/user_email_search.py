@@ -0,0 +1,101 @@
+"""
+Show which indexes the admin email search uses on a large users table.
+
+Copies the structure and indexes of the users table into a scratch schema,
+so run `alembic upgrade head` first. Fills the copy with synthetic users and
+runs UserRepo.search_by_email for a prefix search, a substring search and a
+next-page search. For each one it prints the indexes in the EXPLAIN ANALYZE
+plan and the execution time, then the time with index scans disabled. The
+scratch schema is dropped at the end.
+
+Usage (from backend/):
+    python scripts/benchmarks/user_email_search.py [rows]
+"""
+import sys
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.repositories.user import UserRepo
+
+SCHEMA = "bench_email_search"
+
+
+def plan_indexes(node: dict) -> set[str]:
+    names = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
+
+
+def index_labels(connection) -> dict[str, str]:
+    """Scratch index name -> its definition, since copied indexes get generated names."""
+    rows = connection.execute(text(
+        "SELECT indexname, regexp_replace(indexdef, '^.* USING ', '') FROM pg_indexes WHERE schemaname = :schema"
+    ), {"schema": SCHEMA})
+    return {name: definition for name, definition in rows}
+
+
+def explain(connection, statement: str, parameters) -> tuple[set[str], float]:
+    cursor = connection.connection.cursor()
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+    plan = cursor.fetchone()[0][0]
+    return plan_indexes(plan["Plan"]), plan["Execution Time"]
+
+
+def main(rows: int) -> None:
+    with engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.execute(text(f"CREATE TABLE {SCHEMA}.users (LIKE public.users INCLUDING ALL)"))
+        print(f"Inserting {rows:,} users...")
+        connection.execute(text(f"""
+            INSERT INTO {SCHEMA}.users (id, email, password, is_superuser, is_active, created_at, updated_at)
+            SELECT gen_random_uuid(),
+                   'user' || i || '.' || md5(i::text) || '@' || (ARRAY['example.com', 'corp.io', 'Mail.net'])[1 + i % 3],
+                   'x', false, true, now(), now()
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": rows})
+        connection.execute(text(f"ANALYZE {SCHEMA}.users"))
+        # public stays on the path for the pg_trgm operators
+        connection.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        connection.commit()
+        labels = index_labels(connection)
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        event.listen(connection, "before_cursor_execute", capture)
+        repo = UserRepo(Session(bind=connection))
+        first_page = repo.search_by_email("user4242", prefix=True, limit=21)
+        searches = [
+            ("prefix 'user4242'", lambda: repo.search_by_email("user4242", prefix=True, limit=21)),
+            ("substring 'a1b2'", lambda: repo.search_by_email("a1b2", limit=21)),
+            ("substring 'mail.net'", lambda: repo.search_by_email("mail.net", limit=21)),
+            ("prefix, next page", lambda: repo.search_by_email(
+                "user4242", prefix=True, limit=21, after=(first_page[-1].email.lower(), first_page[-1].id)
+            )),
+        ]
+        print(f"\n{'search':<22} {'indexes used':<50} {'indexed':>10} {'no index':>10}")
+        for name, search in searches:
+            captured.clear()
+            search()
+            statement, parameters = captured[-1]
+            indexes, indexed_ms = explain(connection, statement, parameters)
+            connection.exec_driver_sql("SET enable_indexscan = off; SET enable_bitmapscan = off")
+            _, scan_ms = explain(connection, statement, parameters)
+            connection.exec_driver_sql("RESET enable_indexscan; RESET enable_bitmapscan")
+            used = ", ".join(sorted(labels.get(index, index) for index in indexes)) or "none (sequential scan)"
+            print(f"{name:<22} {used:<50} {indexed_ms:>8.1f}ms {scan_ms:>8.1f}ms")
+        event.remove(connection, "before_cursor_execute", capture)
+
+        connection.rollback()
+        connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        connection.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,71 @@
+"""
+Compare UserRepo lookup throughput: the old legacy Query built per call
+against the cached select() statements used by app.repositories.user.
+
+Runs against DB_URL, which must have the users table and at least one user.
+Prints statements per second for each style and whether SQLAlchemy's
+compiled cache was hit. With a psycopg 3 URL ("postgresql+psycopg://") the
+cached statements are also prepared server-side after DB_PREPARE_THRESHOLD
+executions.
+
+Usage (from backend/):
+    python scripts/benchmarks/user_lookup.py [iterations]
+"""
+import sys
+import time
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.models.user import User
+from app.repositories.user import UserRepo
+
+
+def legacy_get(db, **kwargs):
+    query = db.query(User)
+    for attr, value in kwargs.items():
+        query = query.filter(getattr(User, attr) == value)
+    return query.first()
+
+
+def statements_per_second(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations: int) -> None:
+    cache_hits: list[str] = []
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_cache_hit(conn, cursor, statement, parameters, context, executemany):
+        cache_hits.append(context.cache_hit.name)
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).first()
+        if user is None:
+            sys.exit("Create at least one user first")
+        user_id, email = user.id, user.email
+        repo = UserRepo(db)
+
+        cases = [
+            ("get(id=...)    legacy Query", lambda: legacy_get(db, id=user_id)),
+            ("get(id=...)    cached select", lambda: repo.get(id=user_id)),
+            ("get(email=...) legacy Query", lambda: legacy_get(db, email=email)),
+            ("get(email=...) cached select", lambda: repo.get(email=email)),
+        ]
+        print(f"{iterations} lookups per case, driver {engine.dialect.driver}\n")
+        for name, func in cases:
+            func()  # warm up: first execution compiles
+            cache_hits.clear()
+            rate = statements_per_second(func, iterations)
+            hit_ratio = cache_hits.count("CACHE_HIT") / len(cache_hits)
+            print(f"{name:<32} {rate:>10,.0f} stmt/s   compiled cache hits {hit_ratio:.0%}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
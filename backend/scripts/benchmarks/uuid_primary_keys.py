@@ -0,0 +1,73 @@
+"""
+Compare UUIDv4 and UUIDv7 primary keys at scale.
+
+For each generator, fills a scratch table in DB_URL with ids from Python in
+batches of 50,000 rows. It prints insert throughput, the WAL written, and the
+primary-key index size and leaf density. The scratch schema is dropped at the
+end.
+
+Usage (from backend/):
+    python scripts/benchmarks/uuid_primary_keys.py [rows]
+"""
+import io
+import sys
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.uuid7 import uuid7
+
+SCHEMA = "bench_uuid_keys"
+BATCH = 50_000
+
+
+def fill(connection, table: str, generate, rows: int) -> tuple[float, int]:
+    """Insert `rows` rows with ids from `generate`; return (rows per second, WAL bytes)."""
+    cursor = connection.connection.cursor()
+    cursor.execute("SELECT pg_current_wal_insert_lsn()")
+    wal_start = cursor.fetchone()[0]
+    started = time.perf_counter()
+    for offset in range(0, rows, BATCH):
+        buffer = io.StringIO("".join(f"{generate()}\tuser{offset + i}@example.com\n" for i in range(min(BATCH, rows - offset))))
+        cursor.copy_expert(f"COPY {SCHEMA}.{table} (id, email) FROM STDIN", buffer)
+        connection.connection.commit()
+    elapsed = time.perf_counter() - started
+    cursor.execute("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)", (wal_start,))
+    return rows / elapsed, int(cursor.fetchone()[0])
+
+
+def index_stats(connection, table: str) -> tuple[int, float]:
+    """Primary-key index size in bytes and approximate average page fill (pgstattuple is a contrib module)."""
+    size, pages, tuples = connection.execute(text(
+        f"SELECT pg_relation_size(oid), relpages, reltuples FROM pg_class WHERE oid = '{SCHEMA}.{table}_pkey'::regclass"
+    )).one()
+    # Each entry: 16-byte uuid + 8-byte index tuple header + 4-byte line pointer; page 0 is the metapage
+    return size, tuples * 28 / (max(pages - 1, 1) * 8192)
+
+
+def main(rows: int) -> None:
+    generators = [("uuid4", uuid.uuid4), ("uuid7", uuid7)]
+    with engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        for name, _ in generators:
+            connection.execute(text(f"CREATE TABLE {SCHEMA}.{name} (id uuid PRIMARY KEY, email text NOT NULL)"))
+        connection.commit()
+
+        print(f"{rows:,} rows per table\n")
+        print(f"{'ids':<6} {'rows/s':>10} {'WAL':>10} {'pk index':>10} {'page fill':>10}")
+        for name, generate in generators:
+            rate, wal = fill(connection, name, generate, rows)
+            connection.exec_driver_sql(f"ANALYZE {SCHEMA}.{name}")
+            connection.commit()
+            size, fill_ratio = index_stats(connection, name)
+            print(f"{name:<6} {rate:>10,.0f} {wal / 2**20:>8,.0f}MB {size / 2**20:>8,.0f}MB {fill_ratio:>9.0%}")
+
+        connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        connection.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
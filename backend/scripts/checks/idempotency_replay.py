@@ -0,0 +1,56 @@
+"""
+Fire parallel duplicates of one /register call with a shared Idempotency-Key.
+
+Exactly one request must execute; every other one must get the identical
+status and body with an Idempotent-Replayed header. Then the same key with a
+different body must be rejected with 422. Run it against a server with
+IDEMPOTENCY_BACKEND=postgres and several workers to check the shared store.
+Start the server with RATE_LIMIT_ENABLED=false, or the per-IP register limit
+may answer 429 first.
+
+Usage (from backend/):
+    python scripts/checks/idempotency_replay.py [base_url] [requests]
+"""
+import json
+import sys
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+def register(url: str, key: str, email: str) -> tuple[int, bytes, bool]:
+    body = json.dumps({"email": email, "password": "idempotency-check-password"}).encode()
+    request = Request(
+        url, data=body, method="POST", headers={"Content-Type": "application/json", "Idempotency-Key": key},
+    )
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status, response.read(), response.headers.get("Idempotent-Replayed") == "true"
+    except HTTPError as e:
+        return e.code, e.read(), e.headers.get("Idempotent-Replayed") == "true"
+
+
+def main(base_url: str, requests: int) -> int:
+    url = f"{base_url.rstrip('/')}/api/v1/auth/register"
+    key = str(uuid.uuid4())
+    email = f"idempotency-{key[:8]}@example.com"
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        results = list(pool.map(lambda _: register(url, key, email), range(requests)))
+
+    statuses = Counter(status for status, _, _ in results)
+    bodies = {body for _, body, _ in results}
+    executed = sum(not replayed for _, _, replayed in results)
+    print(f"{requests} duplicates: statuses {dict(statuses)}, distinct bodies {len(bodies)}, executed {executed}")
+
+    mismatch, _, _ = register(url, key, f"other-{email}")
+    print(f"Same key, different body: {mismatch}")
+    return 0 if executed == 1 and len(bodies) == 1 and len(statuses) == 1 and mismatch == 422 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8080",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    ))
@@ -0,0 +1,110 @@
+"""
+Fire many parallel /register calls for one email and check that exactly one wins.
+
+Exactly one must succeed (200) and every other one must get a 409; any 500
+means a duplicate slipped past the insert. Without a base URL the check
+starts the app itself on a free local port, with rate limiting and the job
+scheduler off, against the database in DB_URL (migrated to head), and
+deletes the account it created afterwards. Exits 1 on failure, for CI.
+
+Usage (from backend/):
+    python scripts/checks/register_race.py [--url http://host:port] [--requests 50]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+def register(url: str, email: str) -> int:
+    body = json.dumps({"email": email, "password": "race-check-password"}).encode()
+    request = Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+@contextmanager
+def local_server() -> Iterator[str]:
+    """Serve the app in a background thread; yields its base URL."""
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    import uvicorn
+    from app.main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("The app did not start")
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+def delete_account(email: str) -> None:
+    from app.core.database import SessionLocal
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == email).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def race(base_url: str, requests: int, email: str) -> bool:
+    url = f"{base_url.rstrip('/')}/api/v1/auth/register"
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        statuses = Counter(pool.map(lambda _: register(url, email), range(requests)))
+
+    print(f"{requests} concurrent registrations of {email}: {dict(sorted(statuses.items()))}")
+    if statuses[200] == 1 and statuses[409] == requests - 1:
+        print("OK: one account created, every duplicate rejected with 409")
+        return True
+    print("FAIL: expected exactly one 200 and only 409s otherwise")
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="running server to test (its rate limits must allow the burst)")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    email = f"race-{uuid.uuid4().hex[:12]}@example.com"
+    if args.url:
+        return 0 if race(args.url, args.requests, email) else 1
+    with local_server() as base_url:
+        try:
+            passed = race(base_url, args.requests, email)
+        finally:
+            delete_account(email)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
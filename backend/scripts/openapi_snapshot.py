@@ -0,0 +1,68 @@
+"""
+Write the OpenAPI schema of the app to a snapshot file, or check that the snapshot is current.
+
+The API serves the snapshot instead of generating the schema at runtime
+(see app/core/openapi.py). Run it after changing routes or schemas, and
+commit the result so schema changes show up in review. With --check it
+writes nothing and fails (exit 1) when the snapshot differs from what the
+routes produce; the Docker build runs the check, so a stale snapshot
+fails the build instead of being served. Title and version
+are left out of the comparison, since they come from the deployment.
+
+Usage (from backend/):
+    python scripts/openapi_snapshot.py [--check] [--output openapi.json]
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+from pathlib import Path
+
+# Importing the app needs token secrets; none are used to build the schema
+os.environ.setdefault("SECRET_KEY", "openapi-snapshot")
+os.environ.setdefault("REFRESH_SECRET_KEY", "openapi-snapshot")
+# Snapshotting must not read the snapshot it replaces, and docs must be mounted
+os.environ["OPENAPI_SNAPSHOT"] = ""
+os.environ["DOCS_MODE"] = "public"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.openapi import render_schema  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def comparable(schema: dict) -> dict:
+    info = {key: value for key, value in schema.get("info", {}).items() if key not in ("title", "version")}
+    return {**schema, "info": info}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="fail if the snapshot is out of date instead of writing it")
+    parser.add_argument("--output", default="openapi.json", help="snapshot path (default: openapi.json)")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    schema = app.openapi()
+    if not args.check:
+        output.write_text(render_schema(schema))
+        print(f"Wrote {output} ({len(schema.get('paths', {}))} paths)")
+        return 0
+
+    if not output.is_file():
+        print(f"FAIL: {output} does not exist; run python scripts/openapi_snapshot.py")
+        return 1
+    expected = render_schema(comparable(schema))
+    current = render_schema(comparable(json.loads(output.read_text())))
+    if current == expected:
+        print(f"OK: {output} matches the routes")
+        return 0
+    diff = difflib.unified_diff(current.splitlines(), expected.splitlines(), str(output), "routes", lineterm="", n=2)
+    print("\n".join(list(diff)[:200]))
+    print(f"FAIL: {output} is out of date; run python scripts/openapi_snapshot.py and commit it")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,5 @@ set -e
 
 alembic upgrade head
 
-exec gunicorn app.main:app \
-    --workers 2 \
-    --worker-class uvicorn.workers.UvicornWorker \
-    --bind 0.0.0.0:8080 \
-    --timeout 120 \
-    --graceful-timeout 30 \
-    --log-level info \
-    --access-logfile - \
-    --error-logfile -
-
+# Worker count, preload and timeouts are configured in gunicorn.conf.py
+exec gunicorn app.main:app --config gunicorn.conf.py